@@ -0,0 +1,85 @@
+"""Подсчёт SQL-запросов на запрос к каждому именованному адресу.
+
+Фикстура query_counter выполняет GET-запрос или, если переданы данные,
+POST-запрос с холодным кэшем и запоминает число запросов к базе. В конце прогона pytest печатает
+сводную таблицу, а с --query-report сохраняет её в файл. Под
+pytest-xdist воркеры передают свои замеры управляющему процессу.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+REPORT = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--query-report', metavar='PATH',
+        help='Сохранить таблицу числа SQL-запросов по адресам в файл',
+    )
+
+
+def format_report():
+    sizes = sorted({size for counts in REPORT.values() for size in counts})
+    header = ['URL'] + [f'N={size}' for size in sizes]
+    rows = [
+        [name] + [str(REPORT[name].get(size, '-')) for size in sizes]
+        for name in sorted(REPORT)
+    ]
+    widths = [max(len(row[i]) for row in [header] + rows)
+              for i in range(len(header))]
+    lines = [
+        ' | '.join(
+            cell.ljust(width) for cell, width in zip(row, widths)
+        ).rstrip()
+        for row in [header] + rows
+    ]
+    lines.insert(1, '-+-'.join('-' * width for width in widths))
+    return '\n'.join(lines)
+
+
+def pytest_sessionfinish(session):
+    workeroutput = getattr(session.config, 'workeroutput', None)
+    if workeroutput is not None:
+        workeroutput['query_report'] = REPORT
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    for name, counts in getattr(node, 'workeroutput', {}).get(
+        'query_report', {}
+    ).items():
+        REPORT.setdefault(name, {}).update(counts)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not REPORT:
+        return
+    report = format_report()
+    terminalreporter.write_sep('=', 'SQL-запросы на адрес')
+    terminalreporter.write_line(report)
+    path = config.getoption('--query-report')
+    if path:
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(report + '\n')
+
+
+@pytest.fixture
+def query_counter():
+    def count(name, size, client, url, data=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            if data is None:
+                response = client.get(url)
+            else:
+                response = client.post(url, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        assert response.status_code < 500, (
+            f'Страница `{url}` вернула ошибку {response.status_code}'
+        )
+        REPORT.setdefault(name, {})[size] = len(queries)
+        return len(queries)
+    return count
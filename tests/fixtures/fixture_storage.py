@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+import pytest
+from django.test.utils import override_settings
+
+from core.runner import TEST_SETTINGS
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_media():
+    """Свой MEDIA_ROOT для каждого воркера pytest-xdist, файлы в памяти."""
+    worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+    with tempfile.TemporaryDirectory(
+        prefix=f'yatube-media-{worker}-'
+    ) as media_root:
+        with override_settings(MEDIA_ROOT=media_root, **TEST_SETTINGS):
+            yield media_root
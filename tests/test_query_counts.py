@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+from django.urls import URLPattern, reverse
+
+import pytest
+
+from posts import urls as posts_urls
+from posts.models import Comment, Follow, Group, Post
+
+NAMED_PATTERNS = [
+    pattern for pattern in posts_urls.urlpatterns
+    if isinstance(pattern, URLPattern) and pattern.name
+]
+SIZES = (1, 50)
+# Представления, меняющие данные: корректная форма и кто её отправляет
+POST_CASES = {
+    'post_create': ('viewer', {'text': 'Новый пост', 'group': 'group'}),
+    'post_edit': ('author', {'text': 'Правка', 'group': 'group'}),
+    'add_comment': ('viewer', {'text': 'Новый комментарий'}),
+    'profile_follow': ('viewer', {}),
+    'profile_unfollow': ('viewer', {}),
+}
+
+
+@pytest.fixture
+def dataset(django_user_model):
+    author = django_user_model.objects.create_user(
+        username='author', first_name='Лев', last_name='Толстой'
+    )
+    viewer = django_user_model.objects.create_user(
+        username='viewer', is_staff=True
+    )
+    group = Group.objects.create(title='Группа', slug='group')
+    post = Post.objects.create(author=author, group=group, text='Пост')
+    Comment.objects.create(post=post, author=viewer, text='Комментарий')
+    return SimpleNamespace(
+        author=author,
+        viewer=viewer,
+        group=group,
+        post=post,
+        kwargs={
+            'post_id': post.pk,
+            'slug': group.slug,
+            'username': author.username,
+            'section': 'posts',
+            'shard': 0,
+        },
+    )
+
+
+def grow(dataset, size):
+    """Доводит число постов автора и комментариев к посту до size."""
+    Post.objects.bulk_create(
+        Post(author=dataset.author, group=dataset.group, text='Пост')
+        for _ in range(size - Post.objects.count())
+    )
+    Comment.objects.bulk_create(
+        Comment(post=dataset.post, author=dataset.viewer, text='Комментарий')
+        for _ in range(size - dataset.post.comments.count())
+    )
+    # Отписка в прошлом замере удаляет подписку
+    Follow.objects.get_or_create(user=dataset.viewer, author=dataset.author)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'pattern', NAMED_PATTERNS, ids=[pattern.name for pattern in NAMED_PATTERNS]
+)
+def test_query_count_does_not_grow(pattern, dataset, client, settings,
+                                   query_counter):
+    settings.RATELIMIT_ENABLED = False
+    settings.LIVE_STREAM_SECONDS = 0
+    settings.LIVE_POLL_TIMEOUT = 0
+    client.force_login(dataset.viewer)
+    url = reverse(f'posts:{pattern.name}', kwargs={
+        name: dataset.kwargs[name] for name in pattern.pattern.converters
+    })
+    counts = {}
+    for size in SIZES:
+        grow(dataset, size)
+        counts[size] = query_counter(pattern.name, size, client, url)
+    assert counts[SIZES[0]] == counts[SIZES[-1]], (
+        f'Число SQL-запросов страницы `{url}` растёт вместе с данными: '
+        f'{counts}'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', POST_CASES)
+def test_post_query_count_does_not_grow(name, dataset, client, settings,
+                                        query_counter):
+    settings.RATELIMIT_ENABLED = False
+    user, data = POST_CASES[name]
+    client.force_login(getattr(dataset, user))
+    if 'group' in data:
+        data = dict(data, group=dataset.group.pk)
+    pattern = next(
+        pattern for pattern in NAMED_PATTERNS if pattern.name == name
+    )
+    url = reverse(f'posts:{name}', kwargs={
+        key: dataset.kwargs[key] for key in pattern.pattern.converters
+    })
+    counts = {}
+    for size in SIZES:
+        grow(dataset, size)
+        if name == 'profile_follow':
+            # Подписка должна создаваться, а не находиться готовой
+            Follow.objects.filter(user=dataset.viewer).delete()
+        counts[size] = query_counter(f'{name} POST', size, client, url, data)
+    assert counts[SIZES[0]] == counts[SIZES[-1]], (
+        f'Число SQL-запросов POST `{url}` растёт вместе с данными: '
+        f'{counts}'
+    )
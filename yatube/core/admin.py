@@ -0,0 +1,68 @@
+from django.contrib import admin
+from django.utils.html import format_html, format_html_join
+
+from .models import RequestProfile, SlowQuery
+from .profiling import load_profile
+
+
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created', 'method', 'path', 'user', 'status_code',
+                    'duration', 'query_count')
+    list_select_related = ('user',)
+    list_filter = ('method', 'status_code')
+    search_fields = ('path',)
+    fields = ('created', 'method', 'path', 'user', 'status_code',
+              'duration', 'query_count', 'sql', 'call_tree')
+    readonly_fields = fields
+    empty_value_display = '-пусто-'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def sql(self, obj):
+        return format_html_join(
+            '\n', '<pre>{} мс: {}</pre>',
+            ((float(query['time']) * 1000, query['sql'])
+             for query in load_profile(obj.name)['sql']),
+        )
+    sql.short_description = 'SQL'
+
+    def call_tree(self, obj):
+        return format_html(
+            '<pre>{}</pre>', load_profile(obj.name)['call_tree']
+        )
+    call_tree.short_description = 'Дерево вызовов'
+
+
+admin.site.register(RequestProfile, RequestProfileAdmin)
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('normalized_sql', 'count', 'total_time', 'average_time',
+                    'max_time', 'view', 'last_seen')
+    list_filter = ('view',)
+    search_fields = ('normalized_sql', 'view')
+    fields = ('normalized_sql', 'count', 'total_time', 'max_time', 'view',
+              'frame', 'last_seen', 'sql', 'query_plan')
+    readonly_fields = fields
+    empty_value_display = '-пусто-'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def average_time(self, obj):
+        return round(obj.total_time / obj.count, 2) if obj.count else None
+    average_time.short_description = 'Среднее, мс'
+
+    def query_plan(self, obj):
+        return format_html('<pre>{}</pre>', obj.explain)
+    query_plan.short_description = 'План запроса'
+
+
+admin.site.register(SlowQuery, SlowQueryAdmin)
@@ -0,0 +1,54 @@
+"""Бэкенды кэша, считающие попадания и промахи для метрик.
+
+Ключи группируются по пространству имён: префиксу до первого
+разделителя, а для фрагментов {% cache %} по имени фрагмента.
+"""
+import re
+
+from django.core.cache.backends import locmem
+
+from .metrics import Counter
+
+CACHE_REQUESTS = Counter(
+    'yatube_cache_requests_total', 'Обращения к кэшу на чтение',
+    ('namespace', 'result'),
+)
+SEPARATOR_RE = re.compile(r':|\|\|')
+MISSING = object()
+
+
+def key_namespace(key):
+    if key.startswith('template.cache.'):
+        return key.rsplit('.', 1)[0]
+    return SEPARATOR_RE.split(key, 1)[0]
+
+
+class InstrumentedCacheMixin:
+    # Базовый get_many вызывает get, такие обращения не считаются дважды
+    _in_get_many = False
+
+    def _count(self, key, hit):
+        CACHE_REQUESTS.inc(
+            namespace=key_namespace(key), result='hit' if hit else 'miss'
+        )
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, MISSING, version)
+        if not self._in_get_many:
+            self._count(key, value is not MISSING)
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        self._in_get_many = True
+        try:
+            found = super().get_many(keys, version)
+        finally:
+            self._in_get_many = False
+        for key in keys:
+            self._count(key, key in found)
+        return found
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    pass
@@ -0,0 +1,6 @@
+from .page_cache import register_hole
+
+
+@register_hole('header', 'includes/header.html')
+def header(request):
+    return {}
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from core.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = ('Выводит медленные запросы, сгруппированные по отпечатку, '
+            'в порядке убывания общего времени.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--explain', action='store_true',
+            help='Показывать план последнего запроса',
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Очистить журнал после вывода',
+        )
+
+    def handle(self, *args, limit, explain, reset, **options):
+        self.stdout.write(
+            f'{"Всего, мс":>10} {"Число":>6} {"Среднее":>8} '
+            f'{"Максимум":>8}  Запрос'
+        )
+        for slow_query in SlowQuery.objects.all()[:limit]:
+            self.stdout.write(
+                f'{slow_query.total_time:>10.1f} {slow_query.count:>6} '
+                f'{slow_query.total_time / slow_query.count:>8.1f} '
+                f'{slow_query.max_time:>8.1f}  {slow_query.normalized_sql}'
+            )
+            self.stdout.write(
+                f'{"":>36}{slow_query.view}, {slow_query.frame}'
+            )
+            if explain and slow_query.explain:
+                for line in slow_query.explain.splitlines():
+                    self.stdout.write(f'{"":>36}{line}')
+        if reset:
+            SlowQuery.objects.all().delete()
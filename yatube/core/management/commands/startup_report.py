@@ -0,0 +1,103 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Каждая цель запускается в отдельном «холодном» процессе
+TARGETS = {
+    'check': ['manage.py', 'check'],
+    'wsgi': ['-c', 'import yatube.wsgi'],
+    'test': ['manage.py', 'test', 'about', '--noinput'],
+}
+IMPORT_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(output):
+    """Строки вывода -X importtime: (модуль, собственное, общее, уровень).
+
+    Время в микросекундах, уровень 0 у импортов верхнего уровня.
+    """
+    imports = []
+    for line in output.splitlines():
+        match = IMPORT_RE.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            imports.append(
+                (module, int(own), int(cumulative), (len(indent) - 1) // 2)
+            )
+    return imports
+
+
+def run_target(target, *options):
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, *options, *TARGETS[target]],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'yatube.settings'},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    return time.perf_counter() - started, process.stderr
+
+
+class Command(BaseCommand):
+    help = ('Показывает, какие модули дольше всего импортируются при '
+            'запуске, и замеряет холодный старт.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'target', nargs='?', choices=sorted(TARGETS), default='wsgi'
+        )
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help='Замерить холодный старт всех целей',
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, target, limit, benchmark, repeat, **options):
+        if benchmark:
+            self.benchmark(repeat)
+        else:
+            self.imports(target, limit)
+
+    def imports(self, target, limit):
+        _, output = run_target(target, '-X', 'importtime')
+        imports = parse_importtime(output)
+        total = sum(cumulative for _, _, cumulative, level in imports
+                    if level == 0)
+        packages = defaultdict(int)
+        for module, own, _, _ in imports:
+            packages[module.split('.')[0]] += own
+        self.stdout.write(
+            f'Импорт {target}: {len(imports)} модулей, {total / 1000:.1f} мс'
+        )
+        self.stdout.write('\nПакеты по собственному времени, мс:')
+        for package, own in sorted(
+            packages.items(), key=lambda item: -item[1]
+        )[:limit]:
+            self.stdout.write(f'{own / 1000:>9.1f}  {package}')
+        self.stdout.write('\nМодули по общему времени, мс:')
+        for module, _, cumulative, level in sorted(
+            imports, key=lambda item: -item[2]
+        )[:limit]:
+            self.stdout.write(
+                f'{cumulative / 1000:>9.1f}  {"  " * level}{module}'
+            )
+
+    def benchmark(self, repeat):
+        self.stdout.write(f'Холодный старт, {repeat} запусков, с:')
+        self.stdout.write(f'{"":<8}{"мин.":>8}{"медиана":>9}')
+        for target in TARGETS:
+            timings = [run_target(target)[0] for _ in range(repeat)]
+            self.stdout.write(
+                f'{target:<8}{min(timings):>8.3f}'
+                f'{statistics.median(timings):>9.3f}'
+            )
@@ -0,0 +1,322 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+Счётчики и гистограммы живут в памяти процесса. Если задан
+METRICS_MULTIPROCESS_DIR, каждый процесс (например, воркер gunicorn)
+не чаще раза в METRICS_FLUSH_INTERVAL секунд сбрасывает свои значения
+в файл <pid>.json, а /metrics суммирует файлы всех процессов.
+
+При выходе процесса его файл переносится в archive.json. Если процесс
+умер без этого, файл переносит следующий процесс с тем же pid перед
+первой записью, поэтому счётчики не уменьшаются при повторе pid.
+Менеджер процессов может звать mark_process_dead(pid) сам, например
+из хука child_exit gunicorn.
+"""
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from glob import glob
+
+from django.conf import settings
+from django.db import connections
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf')
+)
+
+ARCHIVE_NAME = 'archive.json'
+LOCK_NAME = 'archive.lock'
+
+_registry = {}
+_lock = threading.Lock()
+_last_flush = 0
+_started = False
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        with _lock:
+            _registry[name] = self
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def values(self):
+        with _lock:
+            return {key: self._copy(value)
+                    for key, value in self._values.items()}
+
+    def clear(self):
+        with _lock:
+            self._values.clear()
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    def samples(self, key, value):
+        yield self.name, key, value
+
+
+class Histogram(Metric):
+    """Гистограмма: счётчики по корзинам, сумма и число наблюдений."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        if self.buckets[-1] != float('inf'):
+            self.buckets += (float('inf'),)
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = next(
+            index for index, bound in enumerate(self.buckets)
+            if value <= bound
+        )
+        with _lock:
+            counts = self._values.setdefault(
+                key, [0] * len(self.buckets) + [0]
+            )
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _copy(self, value):
+        return list(value)
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return list(value)
+        return [left + right for left, right in zip(total, value)]
+
+    def samples(self, key, value):
+        cumulative = 0
+        for bound, count in zip(self.buckets, value):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            yield f'{self.name}_bucket', key + (('le', le),), cumulative
+        yield f'{self.name}_sum', key, value[-1]
+        yield f'{self.name}_count', key, cumulative
+
+
+def snapshot():
+    """Значения всех метрик процесса: {имя: [[метки, значение], ...]}."""
+    return {
+        name: [[list(key), value] for key, value in metric.values().items()]
+        for name, metric in list(_registry.items())
+    }
+
+
+def write_json(directory, name, values):
+    descriptor, path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(descriptor, 'w') as file:
+        json.dump(values, file)
+    os.replace(path, os.path.join(directory, name))
+
+
+def read_json(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def directory_lock(directory, operation):
+    """Блокировка каталога: перенос в архив не пересекается с чтением."""
+    with open(os.path.join(directory, LOCK_NAME), 'a') as file:
+        fcntl.flock(file, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def merge_snapshots(snapshots):
+    """Суммирует снимки в {имя: {метки: значение}}."""
+    totals = {}
+    for values in snapshots:
+        for name, entries in values.items():
+            metric = _registry.get(name)
+            if metric is None:
+                continue
+            merged = totals.setdefault(name, {})
+            for key, value in entries:
+                key = tuple(key)
+                merged[key] = metric.merge(merged.get(key), value)
+    return totals
+
+
+def mark_process_dead(pid, directory=None):
+    """Переносит значения завершившегося процесса в archive.json."""
+    directory = directory or settings.METRICS_MULTIPROCESS_DIR
+    path = os.path.join(directory, f'{pid}.json')
+    with directory_lock(directory, fcntl.LOCK_EX):
+        values = read_json(path)
+        if values is None:
+            return
+        archive = read_json(os.path.join(directory, ARCHIVE_NAME)) or {}
+        totals = merge_snapshots([archive, values])
+        write_json(directory, ARCHIVE_NAME, {
+            name: [[list(key), value] for key, value in entries.items()]
+            for name, entries in totals.items()
+        })
+        os.remove(path)
+
+
+def exit_process(directory):
+    if not os.path.isdir(directory):
+        return
+    write_json(directory, f'{os.getpid()}.json', snapshot())
+    mark_process_dead(os.getpid(), directory)
+
+
+def flush(force=False):
+    """Сбрасывает значения процесса на диск в многопроцессном режиме."""
+    global _last_flush, _started
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    os.makedirs(directory, exist_ok=True)
+    if not _started:
+        # Файл с нашим pid до первой записи оставил умерший процесс
+        _started = True
+        mark_process_dead(os.getpid(), directory)
+        atexit.register(exit_process, directory)
+    write_json(directory, f'{os.getpid()}.json', snapshot())
+
+
+def collect():
+    """Значения метрик, просуммированные по всем процессам.
+
+    Файлы живых процессов и архив завершившихся читаются под общей
+    блокировкой, поэтому перенос файла в архив не виден наполовину.
+    """
+    snapshots = [snapshot()]
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if directory and os.path.isdir(directory):
+        own = os.path.join(directory, f'{os.getpid()}.json')
+        with directory_lock(directory, fcntl.LOCK_SH):
+            for path in glob(os.path.join(directory, '*.json')):
+                if path == own:
+                    continue
+                values = read_json(path)
+                if values is not None:
+                    snapshots.append(values)
+    return merge_snapshots(snapshots)
+
+
+def escape(value):
+    return (str(value).replace('\\', r'\\').replace('\n', r'\n')
+            .replace('"', r'\"'))
+
+
+def format_labels(labelnames, key):
+    pairs = list(zip(labelnames, key[:len(labelnames)]))
+    pairs += list(key[len(labelnames):])
+    if not pairs:
+        return ''
+    return '{{{}}}'.format(','.join(
+        f'{name}="{escape(value)}"' for name, value in pairs
+    ))
+
+
+def render():
+    """Текст в формате экспозиции Prometheus."""
+    lines = []
+    totals = collect()
+    for name, metric in sorted(_registry.items()):
+        lines.append(f'# HELP {name} {escape(metric.documentation)}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for key, value in sorted(totals.get(name, {}).items()):
+            for sample, labels, number in metric.samples(key, value):
+                lines.append('{}{} {}'.format(
+                    sample, format_labels(metric.labelnames, labels),
+                    repr(float(number)),
+                ))
+    return '\n'.join(lines) + '\n'
+
+
+REQUESTS = Counter(
+    'yatube_http_requests_total', 'Число HTTP-запросов',
+    ('view', 'method', 'status'),
+)
+REQUEST_SECONDS = Histogram(
+    'yatube_http_request_duration_seconds', 'Время ответа',
+    ('view',),
+)
+REQUEST_QUERIES = Histogram(
+    'yatube_db_queries_per_request', 'Число SQL-запросов на HTTP-запрос',
+    ('view',), buckets=(0, 1, 2, 5, 10, 20, 50, 100, float('inf')),
+)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unresolved>'
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connections['default'].execute_wrapper(count_query):
+            response = self.get_response(request)
+        view = view_label(request)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, view=view)
+        REQUEST_QUERIES.observe(queries, view=view)
+        REQUESTS.inc(
+            view=view, method=request.method, status=response.status_code
+        )
+        flush()
+        return response
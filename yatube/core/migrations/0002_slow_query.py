@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=32, unique=True)),
+                ('normalized_sql', models.TextField(verbose_name='Нормализованный SQL')),
+                ('sql', models.TextField(verbose_name='Последний запрос')),
+                ('view', models.CharField(max_length=200, verbose_name='Представление')),
+                ('frame', models.CharField(max_length=500, verbose_name='Место вызова')),
+                ('explain', models.TextField(blank=True, verbose_name='План запроса')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Число запросов')),
+                ('total_time', models.FloatField(default=0, verbose_name='Общее время, мс')),
+                ('max_time', models.FloatField(default=0, verbose_name='Максимум, мс')),
+                ('last_seen', models.DateTimeField(auto_now=True, verbose_name='Последний раз')),
+            ],
+            options={
+                'ordering': ['-total_time'],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    """Профиль одного запроса; дерево вызовов и SQL лежат в файле."""
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2000)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             null=True,
+                             on_delete=models.SET_NULL,
+                             related_name='+')
+    status_code = models.PositiveSmallIntegerField()
+    duration = models.FloatField('Длительность, мс')
+    query_count = models.PositiveIntegerField('Запросов к БД')
+    name = models.CharField(max_length=32, unique=True)
+
+    def __str__(self):
+        return f'{self.method} {self.path}'
+
+    class Meta:
+        ordering = ['-created']
+
+
+class SlowQuery(models.Model):
+    """Медленные запросы, сгруппированные по нормализованному SQL."""
+    fingerprint = models.CharField(max_length=32, unique=True)
+    normalized_sql = models.TextField('Нормализованный SQL')
+    sql = models.TextField('Последний запрос')
+    view = models.CharField('Представление', max_length=200)
+    frame = models.CharField('Место вызова', max_length=500)
+    explain = models.TextField('План запроса', blank=True)
+    count = models.PositiveIntegerField('Число запросов', default=0)
+    total_time = models.FloatField('Общее время, мс', default=0)
+    max_time = models.FloatField('Максимум, мс', default=0)
+    last_seen = models.DateTimeField('Последний раз', auto_now=True)
+
+    def __str__(self):
+        return self.normalized_sql[:50]
+
+    class Meta:
+        ordering = ['-total_time']
@@ -0,0 +1,112 @@
+"""Полностраничный кэш с «дырками» под пользовательские фрагменты.
+
+Страница рендерится один раз, а вместо зависящих от пользователя
+фрагментов (шапка, кнопка подписки, форма комментария) в неё попадают
+метки. Для каждого запроса метки заменяются отрисованными фрагментами,
+поэтому общее тело страницы берётся из кэша и для гостей,
+и для авторизованных пользователей.
+"""
+import base64
+import json
+import re
+import uuid
+from functools import wraps
+from hashlib import md5
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+
+VERSION_KEY = 'page_cache:version'
+HOLE_RE = re.compile(r'<!--hole:([A-Za-z0-9_=-]+)-->')
+
+_holes = {}
+
+
+def register_hole(name, template_name):
+    """Регистрирует функцию, возвращающую контекст фрагмента."""
+    def decorator(func):
+        _holes[name] = (template_name, func)
+        return func
+    return decorator
+
+
+def render_hole(request, name, params):
+    template_name, func = _holes[name]
+    return render_to_string(
+        template_name, func(request, **params), request=request
+    )
+
+
+def make_placeholder(name, params):
+    payload = json.dumps([name, params]).encode()
+    return '<!--hole:{}-->'.format(
+        base64.urlsafe_b64encode(payload).decode()
+    )
+
+
+def fill_holes(request, content):
+    def replace(match):
+        name, params = json.loads(base64.urlsafe_b64decode(match.group(1)))
+        return render_hole(request, name, params)
+    return HOLE_RE.sub(replace, content)
+
+
+def invalidate_pages():
+    """Сбрасывает все закэшированные страницы сменой версии."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def pages_version():
+    """Версия данных, меняется при любой записи, сбрасывающей страницы."""
+    return cache.get_or_set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def cached_page(view):
+    """Кэширует GET-ответ представления целиком.
+
+    Тело страницы с метками общее для всех пользователей, для гостей
+    дополнительно кэшируется уже собранная страница.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        version = pages_version()
+        digest = md5(request.get_full_path().encode()).hexdigest()
+        body_key = f'page:{version}:body:{digest}'
+        anonymous_key = f'page:{version}:anonymous:{digest}'
+        anonymous = not request.user.is_authenticated
+        if anonymous:
+            content = cache.get(anonymous_key)
+            if content is not None:
+                response = HttpResponse(content)
+                patch_vary_headers(response, ('Cookie',))
+                return response
+        body = cache.get(body_key)
+        if body is None:
+            request.page_cache_holes = True
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                request.page_cache_holes = False
+            if response.streaming:
+                return response
+            body = response.content.decode(response.charset)
+            if response.status_code != HTTPStatus.OK:
+                response.content = fill_holes(request, body)
+                return response
+            cache.set(body_key, body, settings.PAGE_CACHE_TIMEOUT)
+        else:
+            response = HttpResponse()
+        content = fill_holes(request, body)
+        # Фрагмент с CSRF-токеном нельзя отдавать другим гостям.
+        if anonymous and not request.META.get('CSRF_COOKIE_USED'):
+            cache.set(anonymous_key, content, settings.PAGE_CACHE_TIMEOUT)
+        response.content = content
+        patch_vary_headers(response, ('Cookie',))
+        return response
+    return wrapper
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, router
+from django.utils.functional import cached_property
+
+
+def estimate_count(model):
+    """Оценивает число строк в таблице модели без COUNT(*).
+
+    На SQLite оценка берётся из sqlite_stat1, которую заполняет ANALYZE
+    (команда analyze_tables) и которая отстаёт от таблицы до следующего
+    запуска. Без статистики возвращает None, и считается COUNT(*).
+    """
+    connection = connections[router.db_for_read(model)]
+    table = model._meta.db_table
+    if connection.vendor == 'sqlite':
+        return sqlite_estimate(connection, table)
+    if connection.vendor == 'postgresql':
+        query = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    elif connection.vendor == 'mysql':
+        query = (
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s'
+        )
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(query, [table])
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def sqlite_estimate(connection, table):
+    # Первое число в stat любой строки таблицы — её число строк
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table],
+            )
+            row = cursor.fetchone()
+    except DatabaseError:
+        # ANALYZE ещё не запускался, таблицы статистики нет
+        return None
+    if row is None:
+        return None
+    return int(row[0].split()[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Для большой таблицы без фильтров берёт оценку вместо COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_count(queryset.model)
+            if (estimate is not None
+                    and estimate >= settings.ESTIMATED_COUNT_THRESHOLD):
+                return estimate
+        return super().count
+
+
+class QuerySetChain:
+    """Несколько выборок подряд как один список для Paginator."""
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+
+    @cached_property
+    def counts(self):
+        return [queryset.count() for queryset in self.querysets]
+
+    def count(self):
+        return sum(self.counts)
+
+    def __getitem__(self, index):
+        start, stop = index.start or 0, index.stop
+        items = []
+        for queryset, count in zip(self.querysets, self.counts):
+            if stop <= 0:
+                break
+            if start < count:
+                items.extend(queryset[start:min(stop, count)])
+            start = max(0, start - count)
+            stop -= count
+        return items
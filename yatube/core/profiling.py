@@ -0,0 +1,111 @@
+"""Профилирование отдельных запросов по требованию персонала.
+
+Запрос с параметром ?profile или заголовком X-Profile от сотрудника
+выполняется под cProfile. Дерево вызовов и список SQL сохраняются в
+PROFILING_DIR, в базе остаётся только строка для админки. Хранится не
+больше PROFILING_MAX_ENTRIES профилей. Запросы без триггера проходят
+мимо профилировщика.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import RequestProfile
+
+QUERY_PARAM = 'profile'
+HEADER = 'HTTP_X_PROFILE'
+
+
+def profile_path(name, extension):
+    return os.path.join(settings.PROFILING_DIR, f'{name}.{extension}')
+
+
+def is_triggered(request):
+    if HEADER in request.META:
+        return True
+    # Строка запроса проверяется раньше разбора request.GET
+    return (QUERY_PARAM in request.META.get('QUERY_STRING', '')
+            and QUERY_PARAM in request.GET)
+
+
+def can_profile(user):
+    return settings.PROFILING_ENABLED and user.is_active and user.is_staff
+
+
+def call_tree(profiler):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats('cumulative')
+    stats.print_stats(settings.PROFILING_STATS_LIMIT)
+    stats.print_callees(settings.PROFILING_STATS_LIMIT)
+    return stream.getvalue()
+
+
+def load_profile(name):
+    with open(profile_path(name, 'json'), encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def store_profile(request, response, profiler, queries, duration):
+    name = uuid.uuid4().hex
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    profiler.dump_stats(profile_path(name, 'prof'))
+    with open(profile_path(name, 'json'), 'w', encoding='utf-8') as stream:
+        json.dump({
+            'call_tree': call_tree(profiler),
+            'sql': queries,
+        }, stream, ensure_ascii=False)
+    profile = RequestProfile.objects.create(
+        method=request.method,
+        path=request.get_full_path()[:2000],
+        user=request.user,
+        status_code=response.status_code,
+        duration=round(duration * 1000, 3),
+        query_count=len(queries),
+        name=name,
+    )
+    stale = RequestProfile.objects.values_list('pk', flat=True)[
+        settings.PROFILING_MAX_ENTRIES:
+    ]
+    for old in RequestProfile.objects.filter(pk__in=list(stale)):
+        old.delete()
+    return profile
+
+
+@receiver(post_delete, sender=RequestProfile)
+def remove_profile_files(sender, instance, **kwargs):
+    for extension in ('json', 'prof'):
+        try:
+            os.remove(profile_path(instance.name, extension))
+        except FileNotFoundError:
+            pass
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_triggered(request) or not can_profile(request.user):
+            return self.get_response(request)
+        # django.test тянет unittest и тестовый клиент, а нужен только здесь
+        from django.test.utils import CaptureQueriesContext
+        profiler = cProfile.Profile()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = profiler.runcall(self.get_response, request)
+            duration = time.perf_counter() - started
+        profile = store_profile(
+            request, response, profiler, queries.captured_queries, duration
+        )
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
@@ -0,0 +1,88 @@
+"""Шина событий внутри процесса.
+
+Подписчик получает события своих тем в буфер ограниченного размера:
+если клиент не успевает их забирать, старые события вытесняются, а
+подписка помечается переполненной. Последние события шина хранит,
+чтобы переподключившийся клиент получил пропущенное. События других
+процессов не видны.
+"""
+import threading
+from collections import defaultdict, deque
+
+
+class Subscription:
+    def __init__(self, hub, topics, size):
+        self.hub = hub
+        self.topics = frozenset(topics)
+        self.events = deque(maxlen=size)
+        self.overflowed = False
+        self.ready = threading.Condition(hub.lock)
+
+    def put(self, event):
+        # Вызывается под замком шины
+        if len(self.events) == self.events.maxlen:
+            self.overflowed = True
+        self.events.append(event)
+        self.ready.notify()
+
+    def get(self, timeout=0):
+        """Забирает накопленные события, ожидая их не дольше timeout.
+
+        Возвращает список (id, данные) и признак потери событий.
+        """
+        with self.ready:
+            if timeout > 0:
+                self.ready.wait_for(
+                    lambda: self.events or self.overflowed, timeout
+                )
+            events = list(self.events)
+            self.events.clear()
+            overflowed, self.overflowed = self.overflowed, False
+        return events, overflowed
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Hub:
+    def __init__(self, replay_size=100):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+        self.recent = deque(maxlen=replay_size)
+
+    def subscribe(self, topics, size, after=None):
+        """Подписывает на темы; с after сразу отдаёт более новые события."""
+        subscription = Subscription(self, topics, size)
+        with self.lock:
+            for topic in subscription.topics:
+                self.subscriptions[topic].add(subscription)
+            if after is not None:
+                for event_id, topic, data in self.recent:
+                    if event_id > after and topic in subscription.topics:
+                        subscription.put((event_id, data))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for topic in subscription.topics:
+                subscribers = self.subscriptions.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscriptions[topic]
+
+    def publish(self, topic, event_id, data=None):
+        with self.lock:
+            self.recent.append((event_id, topic, data))
+            for subscription in self.subscriptions.get(topic, ()):
+                subscription.put((event_id, data))
+
+    def subscribers(self):
+        with self.lock:
+            return len(set().union(*self.subscriptions.values()))
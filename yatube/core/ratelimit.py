@@ -0,0 +1,184 @@
+"""Ограничение частоты запросов к пишущим представлениям.
+
+Лимиты задаются в settings.RATELIMITS строками вида '10/m'. Хранилище
+выбирается настройкой RATELIMIT_STORE: LocalStore держит token bucket
+в памяти процесса, CacheStore считает скользящее окно в общем кэше и
+подходит для нескольких процессов и серверов.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.shortcuts import render
+from django.utils.module_loading import import_string
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+OUTCOMES = ('allowed', 'limited')
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """Переводит строку '10/m' в пару (число запросов, период в секундах)."""
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period]
+
+
+class LocalStore:
+    """Token bucket в памяти процесса."""
+
+    max_keys = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._counters = Counter()
+        self._lock = threading.Lock()
+
+    def consume(self, key, limit, period):
+        """Забирает токен и возвращает 0 или секунды до следующего."""
+        now = time.monotonic()
+        refill = limit / period
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (limit, now, now))
+            tokens = min(limit, tokens + (now - updated) * refill)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0
+            else:
+                retry_after = (1 - tokens) / refill
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            full_at = now + (limit - tokens) / refill
+            self._buckets[key] = (tokens, now, full_at)
+        return retry_after
+
+    def _prune(self, now):
+        # Полная корзина ничем не отличается от отсутствующей
+        self._buckets = {
+            key: bucket
+            for key, bucket in self._buckets.items()
+            if bucket[2] > now
+        }
+
+    def count(self, name, outcome):
+        with self._lock:
+            self._counters[name, outcome] += 1
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._counters.clear()
+
+
+class CacheStore:
+    """Скользящее окно на атомарных счётчиках общего кэша."""
+
+    prefix = 'ratelimit'
+
+    def __init__(self):
+        self.cache = caches[settings.RATELIMIT_CACHE]
+
+    def consume(self, key, limit, period):
+        now = time.time()
+        window, elapsed = divmod(now, period)
+        current_key = f'{self.prefix}:{key}:{int(window)}'
+        self.cache.add(current_key, 0, period * 2)
+        current = self.cache.incr(current_key) - 1
+        previous = self.cache.get(f'{self.prefix}:{key}:{int(window) - 1}', 0)
+        weight = 1 - elapsed / period
+        if previous * weight + current + 1 <= limit:
+            return 0
+        self.cache.decr(current_key)
+        if current + 1 <= limit:
+            # Хватит дождаться, пока вклад прошлого окна станет меньше
+            needed = (limit - current - 1) / previous
+            return period * (1 - needed) - elapsed
+        return period - elapsed + period * (1 - (limit - 1) / current)
+
+    def count(self, name, outcome):
+        key = f'{self.prefix}:counter:{name}:{outcome}'
+        self.cache.add(key, 0, None)
+        self.cache.incr(key)
+
+    def counters(self):
+        keys = {
+            f'{self.prefix}:counter:{name}:{outcome}': (name, outcome)
+            for name in settings.RATELIMITS
+            for outcome in OUTCOMES
+        }
+        return {
+            keys[key]: value
+            for key, value in self.cache.get_many(keys).items()
+        }
+
+
+def get_store():
+    path = settings.RATELIMIT_STORE
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = import_string(path)()
+        return _stores[path]
+
+
+@receiver(setting_changed)
+def reset_stores(setting, **kwargs):
+    if setting in ('RATELIMIT_STORE', 'RATELIMIT_CACHE'):
+        with _stores_lock:
+            _stores.clear()
+
+
+def client_key(request):
+    """Авторизованных считает по пользователю, гостей по IP."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return 'ip:{}'.format(request.META.get('REMOTE_ADDR', ''))
+
+
+def get_counters():
+    """Счётчики пропущенных и отклонённых запросов для мониторинга."""
+    counters = get_store().counters()
+    return {
+        name: {
+            outcome: counters.get((name, outcome), 0)
+            for outcome in OUTCOMES
+        }
+        for name in settings.RATELIMITS
+    }
+
+
+def ratelimit(name, methods=None):
+    """Ограничивает частоту вызовов представления лимитом RATELIMITS[name].
+
+    При превышении отвечает 429 с заголовком Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (not settings.RATELIMIT_ENABLED
+                    or (methods and request.method not in methods)):
+                return view(request, *args, **kwargs)
+            limit, period = parse_rate(settings.RATELIMITS[name])
+            store = get_store()
+            retry_after = store.consume(
+                f'{name}:{client_key(request)}', limit, period
+            )
+            if not retry_after:
+                store.count(name, 'allowed')
+                return view(request, *args, **kwargs)
+            store.count(name, 'limited')
+            response = render(request, 'core/429.html', status=429)
+            response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+            return response
+        return wrapper
+    return decorator
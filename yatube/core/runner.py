@@ -0,0 +1,83 @@
+"""Тестовый раннер: параллельный запуск и изоляция файлов.
+
+По умолчанию тесты идут в стольких процессах, сколько ядер.
+Каждый процесс получает свою копию базы (Django клонирует её сам)
+и свой MEDIA_ROOT. Загруженные файлы хранятся в памяти, а пароли
+хэшируются быстрым MD5. Классы с атрибутом serial = True (например,
+запускающие свои процессы) выполняются после остальных в главном
+процессе.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.conf import settings
+from django.test import runner
+from django.test.utils import override_settings
+
+TEST_SETTINGS = {
+    'DEFAULT_FILE_STORAGE': 'core.storage.InMemoryStorage',
+    'THUMBNAIL_STORAGE': 'core.storage.InMemoryStorage',
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+}
+
+
+def init_worker(counter):
+    runner._init_worker(counter)
+    settings.MEDIA_ROOT = os.path.join(
+        settings.MEDIA_ROOT, f'worker-{runner._worker_id}'
+    )
+
+
+def iter_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+
+class ParallelTestSuite(runner.ParallelTestSuite):
+    init_worker = init_worker
+
+    def __init__(self, suite, processes, failfast=False):
+        tests = list(iter_tests(suite))
+        self.serial_suite = unittest.TestSuite(
+            test for test in tests if getattr(test, 'serial', False)
+        )
+        super().__init__(
+            unittest.TestSuite(
+                test for test in tests if not getattr(test, 'serial', False)
+            ),
+            processes,
+            failfast,
+        )
+
+    def run(self, result):
+        result = super().run(result)
+        if not (self.failfast and result.shouldStop):
+            self.serial_suite.run(result)
+        return result
+
+
+class ParallelTestRunner(runner.DiscoverRunner):
+    parallel_test_suite = ParallelTestSuite
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel=runner.default_test_processes())
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.media_root = tempfile.mkdtemp(prefix='yatube-media-')
+        self.test_settings = override_settings(
+            MEDIA_ROOT=self.media_root, **TEST_SETTINGS
+        )
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,143 @@
+"""Журнал медленных SQL-запросов.
+
+SlowQueryMiddleware ставит execute_wrapper на соединения на время
+запроса. Запросы дольше SLOW_QUERY_THRESHOLD мс запоминаются вместе с
+представлением, местом вызова в коде проекта и выводом EXPLAIN, а после
+ответа складываются в SlowQuery по отпечатку нормализованного SQL.
+"""
+import os
+import re
+import time
+import traceback
+from contextlib import ExitStack
+from hashlib import md5
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import SlowQuery
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+CURSOR_MODULE = os.path.join('django', 'db', 'backends', 'utils.py')
+
+
+def normalize_sql(sql):
+    """Заменяет значения на ? и схлопывает списки IN (?, ?, ...)."""
+    sql = LITERAL_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('(?...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return md5(normalized_sql.encode()).hexdigest()
+
+
+def project_frame():
+    """Ближайший к запросу вызов из кода проекта.
+
+    Кадры обёрток execute_wrapper лежат глубже курсора Django и
+    пропускаются вместе с ним.
+    """
+    stack = traceback.extract_stack()
+    for index, frame in enumerate(stack):
+        if frame.filename.endswith(CURSOR_MODULE):
+            stack = stack[:index]
+            break
+    for frame in reversed(stack):
+        filename = os.path.abspath(frame.filename)
+        if (filename.startswith(settings.BASE_DIR)
+                and 'site-packages' not in filename):
+            path = os.path.relpath(filename, settings.BASE_DIR)
+            return f'{path}:{frame.lineno} in {frame.name}'
+    return ''
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else request.path
+
+
+class SlowQueryLogger:
+    def __init__(self, request, connection):
+        self.request = request
+        self.connection = connection
+        self.explaining = False
+        self.entries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= settings.SLOW_QUERY_THRESHOLD:
+            self.entries.append({
+                'sql': sql,
+                'duration': duration,
+                'view': view_name(self.request),
+                'frame': project_frame(),
+                'explain': self.explain(sql, params, many),
+            })
+        return result
+
+    def explain(self, sql, params, many):
+        if many or not sql.lstrip().upper().startswith('SELECT'):
+            return ''
+        prefix = self.connection.ops.explain_query_prefix()
+        self.explaining = True
+        try:
+            with transaction.atomic(using=self.connection.alias):
+                with self.connection.cursor() as cursor:
+                    cursor.execute(f'{prefix} {sql}', params)
+                    return '\n'.join(
+                        ' '.join(str(column) for column in row)
+                        for row in cursor.fetchall()
+                    )
+        except DatabaseError as error:
+            return f'EXPLAIN не выполнен: {error}'
+        finally:
+            self.explaining = False
+
+
+def record_slow_queries(entries):
+    for entry in entries:
+        normalized = normalize_sql(entry['sql'])
+        slow_query, _ = SlowQuery.objects.get_or_create(
+            fingerprint=fingerprint(normalized),
+            defaults={'normalized_sql': normalized},
+        )
+        SlowQuery.objects.filter(pk=slow_query.pk).update(
+            sql=entry['sql'],
+            view=entry['view'][:200],
+            frame=entry['frame'][:500],
+            explain=entry['explain'],
+            count=F('count') + 1,
+            total_time=F('total_time') + entry['duration'],
+            max_time=Greatest(F('max_time'), entry['duration']),
+        )
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SLOW_QUERY_ENABLED:
+            return self.get_response(request)
+        loggers = [
+            SlowQueryLogger(request, connection)
+            for connection in connections.all()
+        ]
+        with ExitStack() as stack:
+            for logger in loggers:
+                stack.enter_context(
+                    logger.connection.execute_wrapper(logger)
+                )
+            response = self.get_response(request)
+        for logger in loggers:
+            record_slow_queries(logger.entries)
+        return response
@@ -0,0 +1,87 @@
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+
+
+@deconstructible
+class InMemoryStorage(Storage):
+    """Хранит файлы в памяти процесса, используется в тестах.
+
+    Файлы общие для всех экземпляров, как у хранилища на диске, поэтому
+    картинки постов и миниатюры sorl видят друг друга.
+    """
+
+    _files = {}
+    _modified = {}
+    _lock = threading.Lock()
+
+    def _open(self, name, mode='rb'):
+        try:
+            return ContentFile(self._files[name], name=name)
+        except KeyError:
+            raise FileNotFoundError(name)
+
+    def _save(self, name, content):
+        content.seek(0)
+        data = b''.join(
+            chunk.encode() if isinstance(chunk, str) else chunk
+            for chunk in content.chunks()
+        )
+        with self._lock:
+            self._files[name] = data
+            self._modified[name] = time.time()
+        return name
+
+    def touch(self, name):
+        with self._lock:
+            self._modified[name] = time.time()
+
+    def get_modified_time(self, name):
+        try:
+            timestamp = self._modified[name]
+        except KeyError:
+            raise FileNotFoundError(name)
+        if settings.USE_TZ:
+            return datetime.fromtimestamp(timestamp, timezone.utc)
+        return datetime.fromtimestamp(timestamp)
+
+    def exists(self, name):
+        return name in self._files
+
+    def delete(self, name):
+        with self._lock:
+            self._files.pop(name, None)
+            self._modified.pop(name, None)
+
+    def size(self, name):
+        return len(self._files[name])
+
+    def url(self, name):
+        return urljoin(settings.MEDIA_URL, filepath_to_uri(name))
+
+    def listdir(self, path):
+        prefix = f'{path.rstrip("/")}/' if path else ''
+        directories, files = set(), []
+        for name in list(self._files):
+            if not name.startswith(prefix):
+                continue
+            head, _, tail = name[len(prefix):].partition('/')
+            if tail:
+                directories.add(head)
+            else:
+                files.append(head)
+        return sorted(directories), sorted(files)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._files.clear()
+            cls._modified.clear()
@@ -0,0 +1,15 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core.page_cache import make_placeholder, render_hole
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **params):
+    """Фрагмент, который отрисовывается для каждого пользователя отдельно."""
+    request = context['request']
+    if getattr(request, 'page_cache_holes', False):
+        return mark_safe(make_placeholder(name, params))
+    return render_hole(request, name, params)
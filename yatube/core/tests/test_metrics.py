@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+
+from posts.models import Post
+from posts.signals import WRITES
+from posts.thumbnails import THUMBNAIL_SECONDS
+
+from .. import metrics
+from ..cache import CACHE_REQUESTS
+
+User = get_user_model()
+TEMP_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def total(metric, **labels):
+    return metric.values().get(metric._key(labels), 0)
+
+
+def observations(histogram, **labels):
+    counts = total(histogram, **labels)
+    return sum(counts[:-1]) if counts else 0
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        for name in ('test_total', 'test_seconds', 'test_workers_total'):
+            self.addCleanup(metrics._registry.pop, name, None)
+
+    def test_registry_render(self):
+        """Счётчики и гистограммы выводятся в формате Prometheus."""
+        counter = metrics.Counter('test_total', 'Тест', ('name',))
+        histogram = metrics.Histogram(
+            'test_seconds', 'Тест', buckets=(1, 5)
+        )
+        counter.inc(name='a"b')
+        counter.inc(2, name='a"b')
+        histogram.observe(0.5)
+        histogram.observe(3)
+        text = metrics.render()
+        self.assertIn('# TYPE test_total counter', text)
+        self.assertIn('test_total{name="a\\"b"} 3.0', text)
+        self.assertIn('test_seconds_bucket{le="1.0"} 1.0', text)
+        self.assertIn('test_seconds_bucket{le="5.0"} 2.0', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 2.0', text)
+        self.assertIn('test_seconds_sum 3.5', text)
+        self.assertIn('test_seconds_count 2.0', text)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_requests_measured(self):
+        """Запросы считаются по имени URL, методу и статусу."""
+        labels = {'view': 'posts:index', 'method': 'GET', 'status': '200'}
+        before = total(metrics.REQUESTS, **labels)
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(total(metrics.REQUESTS, **labels), before + 1)
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        content = response.content.decode()
+        self.assertIn(
+            'yatube_http_request_duration_seconds_count'
+            '{view="posts:index"}', content
+        )
+        self.assertIn(
+            'yatube_db_queries_per_request_sum{view="posts:index"}', content
+        )
+
+    def test_cache_and_writes_counted(self):
+        """Считаются попадания в кэш и созданные записи."""
+        hits = total(CACHE_REQUESTS, namespace='test', result='hit')
+        misses = total(CACHE_REQUESTS, namespace='test', result='miss')
+        cache.get('test:key')
+        cache.set('test:key', 1)
+        cache.get_many(['test:key', 'test:other'])
+        self.assertEqual(
+            total(CACHE_REQUESTS, namespace='test', result='hit'), hits + 1
+        )
+        self.assertEqual(
+            total(CACHE_REQUESTS, namespace='test', result='miss'),
+            misses + 2,
+        )
+        before = total(WRITES, model='post')
+        Post.objects.create(author=self.user, text='Пост')
+        self.assertEqual(total(WRITES, model='post'), before + 1)
+
+    @override_settings(MEDIA_ROOT=TEMP_DIR)
+    def test_thumbnail_time_measured(self):
+        """Время построения миниатюры попадает в гистограмму."""
+        buffer = BytesIO()
+        Image.new('RGB', (40, 20)).save(buffer, 'PNG')
+        name = default_storage.save('source.png', ContentFile(
+            buffer.getvalue()
+        ))
+        before = observations(THUMBNAIL_SECONDS, format='JPEG')
+        get_thumbnail(name, '10x10', format='JPEG')
+        self.assertEqual(
+            observations(THUMBNAIL_SECONDS, format='JPEG'), before + 1
+        )
+
+    def test_multiprocess_aggregation(self):
+        """Значения других процессов суммируются с текущими."""
+        directory = os.path.join(TEMP_DIR, 'metrics')
+        os.makedirs(directory, exist_ok=True)
+        counter = metrics.Counter('test_workers_total', 'Тест')
+        counter.inc(2)
+        with open(os.path.join(directory, '1.json'), 'w') as file:
+            json.dump({'test_workers_total': [[[], 5]]}, file)
+        with override_settings(METRICS_MULTIPROCESS_DIR=directory):
+            metrics.flush(force=True)
+            self.assertTrue(os.path.exists(
+                os.path.join(directory, f'{os.getpid()}.json')
+            ))
+            self.assertIn('test_workers_total 7.0', metrics.render())
+
+    def test_dead_process_archived(self):
+        """Файл умершего процесса уходит в архив, даже если его pid
+        достался новому процессу, и сумма не уменьшается."""
+        directory = os.path.join(TEMP_DIR, 'archive')
+        os.makedirs(directory, exist_ok=True)
+        counter = metrics.Counter('test_workers_total', 'Тест')
+        counter.inc(2)
+        for pid, value in ((1, 3), (os.getpid(), 5)):
+            with open(os.path.join(directory, f'{pid}.json'), 'w') as file:
+                json.dump({'test_workers_total': [[[], value]]}, file)
+        self.addCleanup(setattr, metrics, '_started', metrics._started)
+        metrics._started = False
+        with override_settings(METRICS_MULTIPROCESS_DIR=directory):
+            metrics.flush(force=True)
+            self.assertIn('test_workers_total 10.0', metrics.render())
+            metrics.mark_process_dead(1)
+            self.assertFalse(
+                os.path.exists(os.path.join(directory, '1.json'))
+            )
+            self.assertIn('test_workers_total 10.0', metrics.render())
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_access(self):
+        """Метрики отдаются по токену или персоналу, адрес не важен."""
+        client = Client(REMOTE_ADDR='127.0.0.1')
+        response = client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        client.force_login(
+            User.objects.create_user(username='staff', is_staff=True)
+        )
+        self.assertEqual(
+            client.get(reverse('metrics')).status_code, HTTPStatus.OK
+        )
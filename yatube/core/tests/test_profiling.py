@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import RequestProfile
+
+User = get_user_model()
+PROFILING_DIR = tempfile.mkdtemp()
+
+
+@override_settings(PROFILING_DIR=PROFILING_DIR, PROFILING_MAX_ENTRIES=2)
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser(
+            username='staff', email='staff@example.com', password='pass'
+        )
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(PROFILING_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_staff_request_profiled(self):
+        """Запрос сотрудника с ?profile сохраняет профиль на диск."""
+        response = self.staff_client.get(
+            reverse('posts:index'), {'profile': ''}
+        )
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.path, '/?profile=')
+        self.assertEqual(profile.user, self.staff)
+        self.assertGreater(profile.query_count, 0)
+        response = self.staff_client.get(
+            reverse('admin:core_requestprofile_change', args=(profile.pk,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'SELECT')
+        self.assertContains(response, 'cumulative')
+
+    def test_header_trigger_and_bounded_store(self):
+        """Заголовок тоже включает профилирование, старые профили удаляются."""
+        for _ in range(3):
+            self.staff_client.get(reverse('posts:index'), HTTP_X_PROFILE='1')
+        self.assertEqual(RequestProfile.objects.count(), 2)
+        self.assertEqual(len(os.listdir(PROFILING_DIR)), 4)
+
+    def test_not_profiled_without_permission(self):
+        """Без триггера и прав сотрудника профиль не снимается."""
+        client = Client()
+        client.force_login(self.user)
+        requests = (
+            (Client(), {'profile': ''}),
+            (client, {'profile': ''}),
+            (self.staff_client, {}),
+        )
+        for client, params in requests:
+            with self.subTest(params=params):
+                response = client.get(reverse('posts:index'), params)
+                self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertFalse(RequestProfile.objects.exists())
@@ -0,0 +1,120 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+from ..ratelimit import CacheStore, get_counters, get_store
+
+User = get_user_model()
+
+LIMITS = {
+    'post_create': '2/m',
+    'add_comment': '2/m',
+    'profile_follow': '2/m',
+    'signup': '2/h',
+}
+
+
+@override_settings(RATELIMITS=LIMITS)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        get_store().clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_write_views_are_limited(self):
+        """После исчерпания лимита пишущие представления отдают 429."""
+        requests = {
+            'post_create': (
+                'post', reverse('posts:post_create'), {'text': 'Спам'}),
+            'add_comment': (
+                'post', reverse('posts:add_comment', args=(self.post.pk,)),
+                {'text': 'Спам'}),
+            'profile_follow': (
+                'get', reverse('posts:profile_follow', args=('author',)),
+                {}),
+        }
+        for name, (method, url, data) in requests.items():
+            with self.subTest(name=name):
+                send = getattr(self.authorized_client, method)
+                for _ in range(2):
+                    response = send(url, data)
+                    self.assertEqual(response.status_code, HTTPStatus.FOUND)
+                response = send(url, data)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.TOO_MANY_REQUESTS
+                )
+                self.assertGreaterEqual(int(response['Retry-After']), 1)
+                self.assertEqual(
+                    get_counters()[name], {'allowed': 2, 'limited': 1}
+                )
+        self.assertEqual(Post.objects.filter(text='Спам').count(), 2)
+        self.assertEqual(Comment.objects.filter(text='Спам').count(), 2)
+
+    def test_signup_limited_by_ip(self):
+        """Регистрация ограничивается по IP, GET-запросы не считаются."""
+        client = Client(REMOTE_ADDR='10.0.0.1')
+        url = reverse('users:signup')
+        for number in range(2):
+            client.get(url)
+            client.post(url, {
+                'username': f'user{number}',
+                'password1': 'Sup3r-secret!',
+                'password2': 'Sup3r-secret!',
+            })
+        response = client.post(url, {})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        other = Client(REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other.post(url, {}).status_code, HTTPStatus.OK)
+
+    def test_users_have_separate_buckets(self):
+        """Лимит одного пользователя не затрагивает другого."""
+        url = reverse('posts:post_create')
+        for _ in range(3):
+            self.authorized_client.post(url, {'text': 'Спам'})
+        other = Client()
+        other.force_login(self.author)
+        response = other.post(url, {'text': 'Пост автора'})
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    @override_settings(RATELIMIT_STORE='core.ratelimit.CacheStore')
+    def test_cache_store(self):
+        """Хранилище в кэше считает скользящее окно и счётчики."""
+        cache.clear()
+        store = get_store()
+        self.assertIsInstance(store, CacheStore)
+        self.assertEqual(store.consume('key', 2, 60), 0)
+        self.assertEqual(store.consume('key', 2, 60), 0)
+        self.assertGreater(store.consume('key', 2, 60), 0)
+        store.count('signup', 'limited')
+        self.assertEqual(get_counters()['signup']['limited'], 1)
+
+    @override_settings(RATELIMIT_ENABLED=False)
+    def test_disabled(self):
+        """Отключённый лимитер пропускает все запросы."""
+        url = reverse('posts:profile_follow', args=('author',))
+        for _ in range(3):
+            response = self.authorized_client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_counters_view_for_staff(self):
+        """Счётчики доступны только персоналу."""
+        url = reverse('ratelimit_stats')
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.authorized_client.force_login(staff)
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.json()['signup'], {
+            'allowed': 0, 'limited': 0
+        })
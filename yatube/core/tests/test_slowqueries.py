@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..models import SlowQuery
+from ..slowqueries import normalize_sql
+
+User = get_user_model()
+
+
+class SlowQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_superuser(
+            username='author', email='author@example.com', password='pass'
+        )
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_normalize_sql(self):
+        """Значения и списки IN заменяются, отпечаток от них не зависит."""
+        self.assertEqual(
+            normalize_sql(
+                "SELECT * FROM t WHERE id IN (%s, %s,  %s) "
+                "AND name = 'it''s' LIMIT 10"
+            ),
+            'SELECT * FROM t WHERE id IN (?...) AND name = ? LIMIT ?',
+        )
+        self.assertEqual(
+            normalize_sql('SELECT * FROM t WHERE id IN (%s)'),
+            normalize_sql('SELECT * FROM t WHERE id IN (%s, %s)'),
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_slow_queries_logged_with_context(self):
+        """Запросы группируются по отпечатку с местом вызова и планом."""
+        other = Post.objects.create(author=self.author, text='Другой')
+        for post in (self.post, other):
+            self.client.get(reverse('posts:post_detail', args=(post.pk,)))
+        slow_query = SlowQuery.objects.get(
+            normalized_sql__startswith='SELECT "posts_post"',
+            normalized_sql__contains='"posts_post"."id" = ?',
+            view='posts:post_detail',
+        )
+        self.assertEqual(slow_query.count, 2)
+        self.assertGreater(slow_query.total_time, 0)
+        self.assertGreaterEqual(slow_query.total_time, slow_query.max_time)
+        self.assertIn('posts/views.py', slow_query.frame)
+        self.assertIn('posts_post', slow_query.explain)
+
+    def test_fast_queries_ignored(self):
+        """Запросы быстрее порога не записываются."""
+        self.client.get(reverse('posts:index'))
+        self.assertFalse(SlowQuery.objects.exists())
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_report(self):
+        """Отчёт доступен командой и в админке."""
+        self.client.get(reverse('posts:post_detail', args=(self.post.pk,)))
+        out = StringIO()
+        call_command('slow_queries', explain=True, stdout=out)
+        self.assertIn('posts:post_detail', out.getvalue())
+        self.client.force_login(self.author)
+        response = self.client.get(
+            reverse('admin:core_slowquery_changelist')
+        )
+        self.assertContains(response, 'posts_post')
@@ -0,0 +1,32 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..management.commands.startup_report import parse_importtime
+
+OUTPUT = '''import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   PIL._version
+import time:       200 |        300 | PIL
+import time:        50 |         50 | json
+'''
+
+
+class StartupReportTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        """Разбираются время, модуль и уровень вложенности импорта."""
+        self.assertEqual(parse_importtime(OUTPUT), [
+            ('PIL._version', 100, 100, 1),
+            ('PIL', 200, 300, 0),
+            ('json', 50, 50, 0),
+        ])
+
+    def test_wsgi_skips_heavy_modules(self):
+        """При импорте WSGI-приложения не грузятся Pillow и django.test."""
+        out = StringIO()
+        call_command('startup_report', 'wsgi', limit=1000, stdout=out)
+        modules = [line.split()[-1] for line in out.getvalue().splitlines()
+                   if line.startswith(' ')]
+        self.assertIn('yatube.wsgi', modules)
+        self.assertNotIn('PIL', modules)
+        self.assertNotIn('django.test', modules)
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import get_storage_class
+from django.test import SimpleTestCase
+
+from ..storage import InMemoryStorage
+
+
+class InMemoryStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.storage = InMemoryStorage()
+
+    def test_save_open_delete(self):
+        """Файл сохраняется в памяти, читается и удаляется."""
+        name = self.storage.save('storage-test/a.txt', ContentFile(b'data'))
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), 4)
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), b'data')
+        self.assertEqual(self.storage.url(name), '/media/storage-test/a.txt')
+        self.assertEqual(
+            InMemoryStorage().listdir('storage-test'), ([], ['a.txt'])
+        )
+        self.assertIn('storage-test', self.storage.listdir('')[0])
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        with self.assertRaises(FileNotFoundError):
+            self.storage.open(name)
+
+    def test_test_environment(self):
+        """Тесты пишут файлы в память и в отдельный MEDIA_ROOT."""
+        self.assertIs(get_storage_class(), InMemoryStorage)
+        self.assertFalse(settings.MEDIA_ROOT.startswith(settings.BASE_DIR))
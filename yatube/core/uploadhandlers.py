@@ -0,0 +1,129 @@
+import hashlib
+from collections import namedtuple
+from http import HTTPStatus
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import (SkipFile, StopUpload,
+                                             TemporaryFileUploadHandler)
+from django.http import HttpResponse
+from django.template.defaultfilters import filesizeformat
+
+ImageProbe = namedtuple('ImageProbe', 'format size info')
+
+PROBE_SIZE = 64 * 1024
+
+
+def request_too_large(request):
+    """Сообщение об ошибке, если Content-Length больше допустимого."""
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    if length > settings.UPLOAD_MAX_REQUEST_SIZE:
+        return 'Размер запроса превышает {}.'.format(
+            filesizeformat(settings.UPLOAD_MAX_REQUEST_SIZE)
+        )
+    return None
+
+
+def add_upload_errors(request, form):
+    """Добавляет в форму ошибки файлов, отброшенных при загрузке."""
+    if not form.is_bound:
+        return
+    for field, error in getattr(request, 'upload_errors', {}).items():
+        form.add_error(field, error)
+
+
+class UploadSizeMiddleware:
+    """Отвечает 413 на слишком большой запрос, не читая его тело."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        message = request_too_large(request)
+        if message is not None:
+            return HttpResponse(
+                message,
+                status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                content_type='text/plain; charset=utf-8',
+            )
+        return self.get_response(request)
+
+
+class StreamingUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл по частям.
+
+    Пропускает файл, как только превышен его размер или размер картинки
+    в пикселях, или если по началу файла не удалось прочитать заголовок
+    картинки; причины складываются в request.upload_errors. Запрос больше
+    UPLOAD_MAX_REQUEST_SIZE обрывается без чтения тела, обычно его раньше
+    отклоняет UploadSizeMiddleware.
+    Пока файл идёт, считает SHA-256 и читает заголовок картинки:
+    у готового файла появляются атрибуты content_hash и image_probe.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        self.request.upload_errors = {}
+        self.request_rejected = request_too_large(self.request)
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+        self.sha256 = hashlib.sha256()
+        self.head = b''
+        self.probe = None
+        if self.request_rejected is not None:
+            self.abort(
+                self.request_rejected, StopUpload(connection_reset=True)
+            )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_FILE_SIZE:
+            self.abort('Размер файла превышает {}.'.format(
+                filesizeformat(settings.UPLOAD_MAX_FILE_SIZE)
+            ))
+        self.sha256.update(raw_data)
+        if self.probe is None and len(self.head) < PROBE_SIZE:
+            self.head += raw_data
+            self.probe_image()
+            if self.probe is None and len(self.head) >= PROBE_SIZE:
+                self.abort('Не удалось прочитать заголовок картинки.')
+        return super().receive_data_chunk(raw_data, start)
+
+    def probe_image(self):
+        from PIL import Image
+        try:
+            with Image.open(BytesIO(self.head)) as image:
+                self.probe = ImageProbe(image.format, image.size, image.info)
+        except Image.DecompressionBombError:
+            self.abort('Картинка слишком большая.')
+        except (OSError, SyntaxError, ValueError):
+            return
+        self.head = b''
+        width, height = self.probe.size
+        if width * height > settings.UPLOAD_MAX_IMAGE_PIXELS:
+            self.abort('Картинка больше {} пикселей.'.format(
+                settings.UPLOAD_MAX_IMAGE_PIXELS
+            ))
+
+    def abort(self, message, exception=None):
+        # SkipFile пропускает только этот файл, поля после него сохраняются
+        self.request.upload_errors[self.field_name] = message
+        raise exception or SkipFile()
+
+    def file_complete(self, file_size):
+        if self.probe is None:
+            # Файл короче PROBE_SIZE прочитан целиком и картинкой не является
+            self.request.upload_errors[self.field_name] = (
+                'Не удалось прочитать заголовок картинки.'
+            )
+            self.file.close()
+            return None
+        file = super().file_complete(file_size)
+        file.content_hash = self.sha256.hexdigest()
+        file.image_probe = self.probe
+        return file
@@ -1,5 +1,13 @@
+import hmac
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 
+from . import metrics
+from .ratelimit import get_counters
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -11,3 +19,28 @@ def csrf_failure(request, reason=''):
 
 def server_error(request, reason=''):
     return render(request, 'core/500.html')
+
+
+@staff_member_required
+def ratelimit_stats(request):
+    return JsonResponse(get_counters())
+
+
+def metrics_export(request):
+    """Метрики для Prometheus: по токену METRICS_TOKEN и персоналу."""
+    if has_metrics_token(request):
+        return render_metrics(request)
+    return staff_member_required(render_metrics)(request)
+
+
+def has_metrics_token(request):
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    scheme, _, credentials = header.partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and (
+        hmac.compare_digest(credentials.encode(), token.encode())
+    )
+
+
+def render_metrics(request):
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -1,25 +1,150 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
 
+from core.paginator import EstimatedCountPaginator
+from core.uploadhandlers import add_upload_errors
+
+from .choices import group_choices
 from .models import Group, Follow, Post
+from .moderation import run_in_chunks
+from .tasks import delete_follows, delete_posts, reassign_posts
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """Поле выбора объекта с заранее полученным списком вариантов."""
+
+    def __init__(self, cached_choices, **kwargs):
+        self.cached_choices = cached_choices
+        super().__init__(**kwargs)
+
+    def _get_choices(self):
+        if self.empty_label is None:
+            return list(self.cached_choices)
+        return [('', self.empty_label), *self.cached_choices]
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+
+class PostActionForm(ActionForm):
+    group = CachedModelChoiceField(
+        (),
+        queryset=Group.objects.all(),
+        required=False,
+        label='Группа',
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        field = self.fields['group']
+        field.cached_choices = group_choices()
+        field.widget.choices = field.choices
+
+
+def report(modeladmin, request, action, count, background):
+    if background:
+        message = f'{action} в фоне, поставлено в очередь: {count}.'
+    else:
+        message = f'{action}: {count}.'
+    modeladmin.message_user(request, message)
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    autocomplete_fields = ('author', 'group')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = ('reassign_group', 'delete_by_author', 'purge_spam')
     empty_value_display = '-пусто-'
 
+    def get_form(self, request, obj=None, **kwargs):
+        form_class = super().get_form(request, obj, **kwargs)
+
+        class UploadCheckedForm(form_class):
+            # Отброшенная картинка не должна молча пропасть при сохранении
+            def full_clean(self):
+                super().full_clean()
+                add_upload_errors(request, self)
+
+        return UploadCheckedForm
+
+    def reassign_group(self, request, queryset):
+        try:
+            group = self.action_form.base_fields['group'].clean(
+                request.POST.get('group')
+            )
+        except ValidationError:
+            group = None
+        if group is None:
+            self.message_user(
+                request, 'Выберите группу для переноса.', messages.ERROR
+            )
+            return
+        count, background = run_in_chunks(reassign_posts, queryset, group.pk)
+        report(self, request, 'Перенесено постов', count, background)
+    reassign_group.short_description = 'Перенести в группу'
+
+    def delete_by_author(self, request, queryset):
+        # Выборка сама удаляется по частям, поэтому авторы берутся заранее
+        authors = set(queryset.values_list('author', flat=True))
+        posts = Post.objects.filter(author__in=authors)
+        count, background = run_in_chunks(delete_posts, posts)
+        report(self, request, 'Удалено постов', count, background)
+    delete_by_author.short_description = 'Удалить все посты авторов'
+
+    def purge_spam(self, request, queryset):
+        texts = set(queryset.values_list('text', flat=True))
+        posts = Post.objects.filter(text__in=texts)
+        count, background = run_in_chunks(delete_posts, posts)
+        report(self, request, 'Удалено постов', count, background)
+    purge_spam.short_description = 'Удалить все посты с таким же текстом'
+
+    def get_changelist_form(self, request, **kwargs):
+        # Список групп берётся из кэша один раз на страницу, а не
+        # запросом в каждой строке
+        choices = group_choices()
+
+        class PostChangeListForm(forms.ModelForm):
+            group = CachedModelChoiceField(
+                choices,
+                queryset=Group.objects.all(),
+                required=False,
+            )
+
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('title', 'slug', 'description')
+    search_fields = ('title', 'slug')
     empty_value_display = '-пусто-'
 
 
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('delete_by_follower',)
     empty_value_display = '-пусто-'
 
+    def delete_by_follower(self, request, queryset):
+        users = set(queryset.values_list('user', flat=True))
+        follows = Follow.objects.filter(user__in=users)
+        count, background = run_in_chunks(delete_follows, follows)
+        report(self, request, 'Удалено подписок', count, background)
+    delete_by_follower.short_description = (
+        'Удалить все подписки подписчиков'
+    )
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
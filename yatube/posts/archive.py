@@ -0,0 +1,41 @@
+"""Перенос старых постов с комментариями в архивные таблицы.
+
+Горячие таблицы Post и Comment остаются небольшими, а страницы поста и
+профиля дочитывают архив сами. Архивный пост сохраняет исходный id.
+"""
+from django.db import transaction
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .moderation import delete_post_rows, id_chunks
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author_id', 'group_id',
+    'image', 'image_width', 'image_height', 'version',
+)
+COMMENT_FIELDS = ('post_id', 'author_id', 'text', 'created')
+
+
+def archive_chunk(post_ids, batch_size):
+    with transaction.atomic():
+        ArchivedPost.objects.bulk_create(
+            (ArchivedPost(**row) for row in Post.objects.filter(
+                pk__in=post_ids
+            ).values(*POST_FIELDS)),
+            batch_size=batch_size,
+        )
+        ArchivedComment.objects.bulk_create(
+            (ArchivedComment(**row) for row in Comment.objects.filter(
+                post_id__in=post_ids
+            ).values(*COMMENT_FIELDS).iterator()),
+            batch_size=batch_size,
+        )
+        return delete_post_rows(post_ids)
+
+
+def archive_posts(cutoff, batch_size):
+    """Переносит посты старше cutoff в архив и возвращает их число."""
+    posts = Post.objects.filter(pub_date__lt=cutoff)
+    archived = 0
+    for chunk in id_chunks(posts, batch_size):
+        archived += archive_chunk(chunk, batch_size)
+    return archived
@@ -0,0 +1,107 @@
+"""Кэш отрисованных карточек постов для лент.
+
+Ключ карточки состоит из id и версии поста и версий его автора и
+группы. Версия поста растёт при его правке, а версии автора и группы
+хранятся в кэше и сменяются при переименовании автора или изменении
+группы, поэтому ни карточки, ни строки постов трогать не нужно. Для
+каждой ленты считаются попадания и промахи.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+STATS_KEY = 'post_card:stats:{feed}:{outcome}'
+VERSION_KEY = 'post_card:version:{kind}:{pk}'
+OUTCOMES = ('hits', 'misses')
+FEEDS = ('index', 'group_list', 'profile', 'follow_index', 'trending')
+
+
+def version_keys(post):
+    author = VERSION_KEY.format(kind='author', pk=post.author_id)
+    group = VERSION_KEY.format(kind='group', pk=post.group_id or 0)
+    return author, group
+
+
+def related_versions(keys):
+    """Версии авторов и групп, недостающие заводятся заново."""
+    versions = cache.get_many(keys)
+    missing = set(keys) - versions.keys()
+    for key in missing:
+        cache.add(key, uuid.uuid4().hex[:8], None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def card_keys(posts):
+    versions = related_versions(
+        {key for post in posts for key in version_keys(post)}
+    )
+    return [
+        'post_card:{}:{}:{}:{}'.format(
+            post.pk, post.version,
+            *(versions.get(key) for key in version_keys(post))
+        )
+        for post in posts
+    ]
+
+
+def card_key(post):
+    return card_keys([post])[0]
+
+
+def bump_card_version(kind, pk):
+    """Сбрасывает карточки всех постов автора или группы."""
+    cache.delete(VERSION_KEY.format(kind=kind, pk=pk))
+
+
+def render_cards(posts, feed):
+    """Возвращает HTML карточек постов, отрисовывая только промахи."""
+    posts = list(posts)
+    keys = card_keys(posts)
+    cards = cache.get_many(keys)
+    missing = {
+        key: render_to_string(CARD_TEMPLATE, {'post': post})
+        for key, post in zip(keys, posts)
+        if key not in cards
+    }
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    count_outcome(feed, 'hits', len(posts) - len(missing))
+    count_outcome(feed, 'misses', len(missing))
+    return [cards[key] for key in keys]
+
+
+def count_outcome(feed, outcome, value):
+    if not value:
+        return
+    key = STATS_KEY.format(feed=feed, outcome=outcome)
+    cache.add(key, 0, None)
+    cache.incr(key, value)
+
+
+def card_stats():
+    """Попадания, промахи и доля попаданий кэша карточек по лентам."""
+    keys = {
+        STATS_KEY.format(feed=feed, outcome=outcome): (feed, outcome)
+        for feed in FEEDS
+        for outcome in OUTCOMES
+    }
+    values = cache.get_many(keys)
+    stats = {}
+    for feed in FEEDS:
+        hits, misses = (
+            values.get(STATS_KEY.format(feed=feed, outcome=outcome), 0)
+            for outcome in OUTCOMES
+        )
+        total = hits + misses
+        stats[feed] = {
+            'hits': hits,
+            'misses': misses,
+            'ratio': round(hits / total, 4) if total else None,
+        }
+    return stats
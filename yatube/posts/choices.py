@@ -0,0 +1,20 @@
+from django.core.cache import cache
+
+from .models import Group
+
+GROUP_CHOICES_KEY = 'posts:group_choices'
+
+
+def group_choices():
+    """Список (pk, название) всех групп, хранится в кэше до их изменения."""
+    choices = cache.get(GROUP_CHOICES_KEY)
+    if choices is None:
+        choices = list(
+            Group.objects.order_by('title').values_list('pk', 'title')
+        )
+        cache.set(GROUP_CHOICES_KEY, choices, None)
+    return choices
+
+
+def invalidate_group_choices():
+    cache.delete(GROUP_CHOICES_KEY)
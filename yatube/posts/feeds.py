@@ -0,0 +1,166 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from .cards import related_versions, version_keys
+from .models import Group, Post, User
+
+
+def cached_feed(feed_posts):
+    """Кэширует ленту по состоянию её последних постов.
+
+    ETag складывается из id и версий постов ленты и версий их авторов
+    и групп из кэша карточек, поэтому его меняют только новые, изменённые
+    и удалённые посты и переименования авторов и групп. Опрос ленты без
+    изменений стоит одного индексного запроса и заканчивается ответом 304.
+    """
+    def decorator(feed):
+        def wrapper(request, **kwargs):
+            posts = feed_posts(**kwargs)
+            versions = related_versions(
+                {key for post in posts for key in version_keys(post)}
+            )
+            state = ','.join(
+                '{}:{}:{}:{}'.format(
+                    post.pk, post.version,
+                    *(versions.get(key) for key in version_keys(post))
+                )
+                for post in posts
+            )
+            etag = quote_etag(md5(
+                f'{request.path}:{state}'.encode()
+            ).hexdigest())
+            # Правка поста не меняет дату, поэтому 304 только по ETag
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                key = f'feed:{etag}'
+                cached = cache.get(key)
+                if cached is None:
+                    response = feed(request, **kwargs)
+                    cache.set(
+                        key,
+                        (response.content, response['Content-Type']),
+                        settings.FEED_CACHE_TIMEOUT,
+                    )
+                else:
+                    content, content_type = cached
+                    response = HttpResponse(
+                        content, content_type=content_type
+                    )
+            response['ETag'] = etag
+            if posts:
+                response['Last-Modified'] = http_date(
+                    posts[0].pub_date.timestamp()
+                )
+            patch_cache_control(
+                response, public=True, max_age=settings.FEED_MAX_AGE
+            )
+            return response
+        return wrapper
+    return decorator
+
+
+def feed_posts(**lookups):
+    return list(Post.objects.filter(**lookups).values_list(
+        'pk', 'pub_date', 'version', 'author_id', 'group_id', named=True
+    )[:settings.FEED_ITEMS])
+
+
+def group_feed_posts(slug):
+    return feed_posts(group__slug=slug)
+
+
+def author_feed_posts(username):
+    return feed_posts(author__username=username)
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).select_related(
+            'author', 'group'
+        )[:settings.FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.text[:50]
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=(obj.slug,))
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Записи пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=(obj.username,))
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
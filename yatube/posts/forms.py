@@ -1,5 +1,7 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from .images import process_image
 from .models import Comment, Post
 
 
@@ -14,6 +16,15 @@ class PostForm(forms.ModelForm):
             'text': ('Текст нового поста'),
             'group': ('Группа, к которой будет относиться пост'), }
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            image, size = process_image(image)
+            self.instance.image_width, self.instance.image_height = size
+        elif not image:
+            self.instance.image_width = self.instance.image_height = None
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
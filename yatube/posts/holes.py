@@ -0,0 +1,45 @@
+from core.page_cache import register_hole
+
+from .forms import CommentForm
+from .models import Follow
+from .notifications import unread_count
+
+
+@register_hole('switcher', 'posts/includes/switcher.html')
+def switcher(request, **active):
+    return active
+
+
+@register_hole('follow_button', 'posts/includes/follow_button.html')
+def follow_button(request, username):
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user,
+        author__username=username
+    ).exists()
+    return {
+        'username': username,
+        'following': following,
+    }
+
+
+@register_hole('post_edit_button', 'posts/includes/post_edit_button.html')
+def post_edit_button(request, post_id, author):
+    return {
+        'post_id': post_id,
+        'is_author': request.user.username == author,
+    }
+
+
+@register_hole('comment_form', 'posts/includes/comment_form.html')
+def comment_form(request, post_id):
+    return {
+        'post_id': post_id,
+        'form': CommentForm(),
+    }
+
+
+@register_hole(
+    'notifications_badge', 'posts/includes/notifications_badge.html'
+)
+def notifications_badge(request):
+    return {'unread': unread_count(request.user)}
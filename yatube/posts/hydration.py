@@ -0,0 +1,85 @@
+"""Сборка постов для лент по списку id из кэша объектов.
+
+Посты, авторы и группы кэшируются по отдельности, поэтому смена имени
+автора или названия группы сбрасывает одну запись, а не все посты.
+Промахи каждого вида добираются одним запросом.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Group, Post, User
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author_id', 'group_id',
+    'image', 'image_width', 'image_height', 'version',
+)
+AUTHOR_FIELDS = ('id', 'username', 'first_name', 'last_name')
+GROUP_FIELDS = ('id', 'title', 'slug')
+
+
+def object_key(kind, pk):
+    return f'hydrate:{kind}:{pk}'
+
+
+def cached_objects(model, kind, fields, ids):
+    keys = {object_key(kind, pk): pk for pk in ids}
+    objects = {
+        keys[key]: obj for key, obj in cache.get_many(keys).items()
+    }
+    missing = [pk for pk in keys.values() if pk not in objects]
+    if missing:
+        fetched = model._base_manager.only(*fields).in_bulk(missing)
+        cache.set_many(
+            {object_key(kind, pk): obj for pk, obj in fetched.items()},
+            settings.HYDRATION_CACHE_TIMEOUT,
+        )
+        objects.update(fetched)
+    return objects
+
+
+def hydrate_posts(ids):
+    """Возвращает посты с авторами и группами в порядке ids.
+
+    Id, которых уже нет в базе, пропускаются.
+    """
+    posts = cached_objects(Post, 'post', POST_FIELDS, ids)
+    authors = cached_objects(
+        User, 'author', AUTHOR_FIELDS,
+        {post.author_id for post in posts.values()},
+    )
+    groups = cached_objects(
+        Group, 'group', GROUP_FIELDS,
+        {post.group_id for post in posts.values() if post.group_id},
+    )
+    hydrated = []
+    for pk in ids:
+        post = posts.get(pk)
+        if post is None or post.author_id not in authors:
+            continue
+        post.author = authors[post.author_id]
+        post.group = groups.get(post.group_id)
+        hydrated.append(post)
+    return hydrated
+
+
+def forget(kind, ids):
+    cache.delete_many([object_key(kind, pk) for pk in ids])
+
+
+def forget_posts(ids):
+    forget('post', ids)
+
+
+class HydratedPosts:
+    """Выборка постов для Paginator: из базы читаются только id."""
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def count(self):
+        return self.queryset.count()
+
+    def __getitem__(self, index):
+        return hydrate_posts(
+            list(self.queryset.values_list('pk', flat=True)[index])
+        )
@@ -0,0 +1,132 @@
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'WEBP': 'webp',
+}
+
+
+# Форматы вариантов в порядке предпочтения; sorl умеет только WEBP
+VARIANT_FORMATS = ('WEBP', 'JPEG')
+METADATA_KEYS = {'exif', 'xmp', 'XML:com.adobe.xmp', 'comment'}
+MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'WEBP': 'image/webp',
+}
+
+
+def output_format():
+    """Формат хранения картинок; WEBP только если Pillow его поддерживает."""
+    from PIL import features
+    image_format = settings.POST_IMAGE_FORMAT
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def is_ingested(probe):
+    """Картинка уже в нужном формате, размере и без метаданных."""
+    max_width, max_height = settings.POST_IMAGE_MAX_SIZE
+    width, height = probe.size
+    return (
+        probe.format == output_format()
+        and width <= max_width
+        and height <= max_height
+        and not METADATA_KEYS & probe.info.keys()
+    )
+
+
+def process_image(uploaded):
+    """Уменьшает, перекодирует и очищает от метаданных загруженную картинку.
+
+    Возвращает файл и его размеры. Картинка, которой обработка не нужна
+    (по заголовку, прочитанному при загрузке), сохраняется как есть.
+    """
+    probe = getattr(uploaded, 'image_probe', None)
+    if probe is not None and is_ingested(probe):
+        return uploaded, probe.size
+    from PIL import Image, ImageOps
+    uploaded.seek(0)
+    image = Image.open(uploaded)
+    # Поворот из EXIF применяется до того, как метаданные будут отброшены
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(settings.POST_IMAGE_MAX_SIZE, Image.LANCZOS)
+    image_format = output_format()
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        image_format,
+        quality=settings.POST_IMAGE_QUALITY,
+        optimize=True,
+    )
+    name = os.path.splitext(os.path.basename(uploaded.name))[0]
+    return (
+        ContentFile(
+            buffer.getvalue(), name=f'{name}.{EXTENSIONS[image_format]}'
+        ),
+        image.size,
+    )
+
+
+def variant_formats():
+    from PIL import Image
+    Image.init()
+    return [
+        image_format for image_format in VARIANT_FORMATS
+        if image_format in Image.SAVE
+    ]
+
+
+def variant_widths(source_width=None):
+    """Ширины вариантов без увеличения исходника, кроме основной."""
+    default_width = settings.POST_THUMBNAIL_SIZE[0]
+    return [
+        width for width in settings.POST_THUMBNAIL_WIDTHS
+        if width == default_width
+        or source_width is None
+        or width <= source_width
+    ]
+
+
+def image_variants(image, source_width=None):
+    """Миниатюры картинки поста для srcset.
+
+    Возвращает словарь {формат: [(ширина, миниатюра), ...]}
+    по возрастанию ширины.
+    Ошибки, как и в теге thumbnail, только пишутся в лог.
+    """
+    from sorl.thumbnail import get_thumbnail
+    from sorl.thumbnail.conf import settings as thumbnail_settings
+    default_width, default_height = settings.POST_THUMBNAIL_SIZE
+    variants = {}
+    try:
+        for image_format in variant_formats():
+            variants[image_format] = [
+                (width, get_thumbnail(
+                    image,
+                    f'{width}x{round(width * default_height / default_width)}',
+                    crop='center',
+                    upscale=True,
+                    format=image_format,
+                ))
+                for width in variant_widths(source_width)
+            ]
+    except Exception:
+        if thumbnail_settings.THUMBNAIL_DEBUG:
+            raise
+        logger.exception('Не удалось построить варианты картинки %s', image)
+        return {}
+    return variants
@@ -0,0 +1,177 @@
+"""Живое обновление лент index и follow_index.
+
+После коммита нового поста его id публикуется в шину процесса. Клиент
+ленты держит поток server-sent events (или, без EventSource, опрашивает
+long-poll) и показывает «N новых постов», а по нажатию забирает только
+карточки новых постов вместо всей ленты. Id события — id поста, поэтому
+после переподключения Last-Event-ID отдаёт пропущенные посты.
+
+Поток или опрос занимает поток сервера, поэтому одновременно открыто
+не больше LIVE_MAX_CONNECTIONS соединений на процесс, остальные получают
+503 с советом повторить позже. Соединение с базой закрывается до
+ожидания, а поток живёт не дольше LIVE_STREAM_SECONDS, затем браузер
+переподключается сам.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.http import (Http404, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
+
+from core.pubsub import Hub
+
+from .cards import render_cards
+from .hydration import hydrate_posts
+
+HUB = Hub(settings.LIVE_REPLAY_SIZE)
+INDEX_TOPIC = 'posts'
+FEEDS = ('index', 'follow_index')
+
+_active = 0
+_lock = threading.Lock()
+
+
+def author_topic(author_id):
+    return f'author:{author_id}'
+
+
+def publish_post(post):
+    HUB.publish(INDEX_TOPIC, post.pk)
+    HUB.publish(author_topic(post.author_id), post.pk)
+
+
+def feed_topics(request):
+    feed = request.GET.get('feed', 'index')
+    if feed == 'index':
+        return {INDEX_TOPIC}
+    # У анонима нет ленты подписок
+    if feed not in FEEDS or not request.user.is_authenticated:
+        raise Http404
+    return {
+        author_topic(author_id) for author_id in
+        request.user.follower.values_list('author_id', flat=True)
+    }
+
+
+def last_seen(request):
+    """Id последнего поста, который уже есть у клиента."""
+    after = request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('after')
+    return int(after) if after and after.isdigit() else None
+
+
+def notice(events, overflowed):
+    ids = sorted({event_id for event_id, _ in events}, reverse=True)
+    return {
+        'count': len(ids),
+        'ids': ids,
+        'last_id': ids[0] if ids else None,
+        # Часть событий вытеснена из буфера, ленту надо перезагрузить
+        'reload': overflowed,
+    }
+
+
+def acquire_slot():
+    global _active
+    with _lock:
+        if _active >= settings.LIVE_MAX_CONNECTIONS:
+            return False
+        _active += 1
+        return True
+
+
+def release_slot():
+    global _active
+    with _lock:
+        _active -= 1
+
+
+def busy(response):
+    response.status_code = 503
+    response['Retry-After'] = settings.LIVE_BUSY_RETRY_MS // 1000
+    return response
+
+
+class EventStream:
+    """Тело ответа SSE, слот освобождается при закрытии ответа.
+
+    Сервер вызывает close() и для потока, который не начал читать.
+    """
+
+    def __init__(self, topics, after):
+        self.events = self.generate(topics, after)
+        self.closed = False
+
+    def __iter__(self):
+        return self.events
+
+    def generate(self, topics, after):
+        # Поток ждёт событий минутами, соединение с базой ему не нужно
+        connections.close_all()
+        subscription = HUB.subscribe(topics, settings.LIVE_BUFFER_SIZE, after)
+        deadline = time.monotonic() + settings.LIVE_STREAM_SECONDS
+        with subscription:
+            yield f'retry: {settings.LIVE_RETRY_MS}\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                events, overflowed = subscription.get(
+                    max(0, min(settings.LIVE_HEARTBEAT_SECONDS, remaining))
+                )
+                if events or overflowed:
+                    data = notice(events, overflowed)
+                    yield (f'id: {data["last_id"] or ""}\nevent: posts\n'
+                           f'data: {json.dumps(data)}\n\n')
+                elif remaining <= 0:
+                    return
+                else:
+                    yield ': ping\n\n'
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.events.close()
+            release_slot()
+
+
+def stream(request):
+    topics, after = feed_topics(request), last_seen(request)
+    if not acquire_slot():
+        return busy(HttpResponse(
+            f'retry: {settings.LIVE_BUSY_RETRY_MS}\n\n',
+            content_type='text/event-stream',
+        ))
+    response = StreamingHttpResponse(
+        EventStream(topics, after), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def poll(request):
+    """Long-poll для клиентов без EventSource."""
+    topics, after = feed_topics(request), last_seen(request)
+    if not acquire_slot():
+        return busy(JsonResponse({'retry': settings.LIVE_BUSY_RETRY_MS}))
+    try:
+        connections.close_all()
+        with HUB.subscribe(
+            topics, settings.LIVE_BUFFER_SIZE, after
+        ) as subscription:
+            events, overflowed = subscription.get(settings.LIVE_POLL_TIMEOUT)
+    finally:
+        release_slot()
+    return JsonResponse(notice(events, overflowed))
+
+
+def new_posts(request):
+    """Карточки новых постов по списку id, без запросов к ленте."""
+    feed = request.GET.get('feed', 'index')
+    if feed not in FEEDS:
+        raise Http404
+    ids = [int(pk) for pk in request.GET.get('ids', '').split(',')
+           if pk.isdigit()][:settings.LIVE_BUFFER_SIZE]
+    posts = hydrate_posts(sorted(ids, reverse=True))
+    return HttpResponse('<hr>'.join(render_cards(posts, feed)))
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = ('Переносит посты старше заданного возраста вместе '
+            'с комментариями в архивные таблицы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Возраст поста в днях, после которого он уходит в архив',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE
+        )
+
+    def handle(self, *args, days, batch_size, **options):
+        cutoff = timezone.now() - timedelta(days=days)
+        archived = archive_posts(cutoff, batch_size)
+        self.stdout.write(f'Перенесено в архив постов: {archived}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.page_cache import invalidate_pages
+from posts.trending import decay_scores
+
+
+class Command(BaseCommand):
+    help = ('Уменьшает счета популярных постов с учётом прошедшего '
+            'времени. Запускается периодически, например из cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=1,
+            help='Сколько часов прошло с прошлого запуска',
+        )
+
+    def handle(self, *args, hours, **options):
+        remaining = decay_scores(hours)
+        invalidate_pages()
+        self.stdout.write(f'Популярных постов после затухания: {remaining}')
@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import export_records, write_csv, write_ndjson
+
+WRITERS = {
+    'ndjson': write_ndjson,
+    'csv': write_csv,
+}
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает группы, посты, комментарии, архив и '
+            'подписки в NDJSON или CSV. Файлы картинок не копируются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=WRITERS, default='ndjson')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout'
+        )
+        parser.add_argument('--progress-every', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        output = options['output']
+        stream = (
+            open(output, 'w', encoding='utf-8', newline='')
+            if output else sys.stdout
+        )
+        try:
+            records = WRITERS[options['format']](export_records(), stream)
+            for count, record in enumerate(records, 1):
+                if count % options['progress_every'] == 0:
+                    self.stderr.write(f'Выгружено записей: {count}')
+        finally:
+            if output:
+                stream.close()
@@ -0,0 +1,42 @@
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import import_records, read_csv, read_ndjson
+
+READERS = {
+    'ndjson': read_ndjson,
+    'csv': read_csv,
+}
+
+
+class Command(BaseCommand):
+    help = ('Загружает выгрузку export_posts пачками через bulk_create. '
+            'Недостающие пользователи создаются неактивными.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Файл выгрузки или - для stdin')
+        parser.add_argument('--format', choices=READERS, default='ndjson')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['input']
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        totals = Counter()
+        try:
+            records = READERS[options['format']](stream)
+            for model, count in import_records(
+                records, options['batch_size']
+            ):
+                totals[model] += count
+                self.stderr.write(f'{model}: {totals[model]}')
+        finally:
+            if path != '-':
+                stream.close()
+        self.stdout.write(', '.join(
+            f'{model}: {count}' for model, count in totals.items()
+        ))
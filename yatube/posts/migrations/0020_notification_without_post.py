@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:58
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    """Склеивает непрочитанные уведомления без поста перед ограничением."""
+    Notification = apps.get_model('posts', 'Notification')
+    unread = Notification.objects.filter(read=False, post__isnull=True)
+    duplicates = unread.order_by().values('recipient', 'kind').annotate(
+        rows=Count('pk'), total=Sum('count')
+    ).filter(rows__gt=1)
+    for duplicate in duplicates:
+        rows = unread.filter(
+            recipient=duplicate['recipient'], kind=duplicate['kind']
+        ).order_by('-updated', '-pk')
+        newest = rows.first()
+        rows.exclude(pk=newest.pk).delete()
+        Notification.objects.filter(pk=newest.pk).update(
+            count=duplicate['total']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_notification'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('post__isnull', True), ('read', False)), fields=('recipient', 'kind'), name='unique unread notification without post'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -15,7 +17,7 @@ class Group(models.Model):
 
 class Post(models.Model):
     text = models.TextField()
-    pub_date = models.DateTimeField(auto_now_add=True)
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True)
     author = models.ForeignKey(User,
                                on_delete=models.CASCADE,
                                related_name='posts')
@@ -26,13 +28,32 @@ class Post(models.Model):
                               related_name='posts')
     image = models.ImageField('Картинка',
                               upload_to='posts/',
+                              storage=ContentAddressedStorage(),
+                              db_index=True,
                               blank=True)
+    image_width = models.PositiveIntegerField(null=True,
+                                              blank=True,
+                                              editable=False)
+    image_height = models.PositiveIntegerField(null=True,
+                                               blank=True,
+                                               editable=False)
+    # Растёт при правке отображаемых полей поста, входит в ключ кэша
+    # карточки; переименования автора и группы меняют их версии в cards
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Популярность: растёт при комментариях и подписках на автора,
+    # периодически затухает командой decay_trending
+    trending_score = models.FloatField(default=0, editable=False)
 
     def __str__(self):
         return self.text[:15]
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-trending_score', '-id'], name='post_trending_idx'
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -52,6 +73,56 @@ class Comment(models.Model):
         ordering = ['-created']
 
 
+class ArchivedPost(models.Model):
+    """Старый пост, перенесённый из Post командой archive_posts.
+
+    Сохраняет исходный id, поэтому адрес поста не меняется.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    pub_date = models.DateTimeField(db_index=True)
+    author = models.ForeignKey(User,
+                               on_delete=models.CASCADE,
+                               related_name='archived_posts')
+    group = models.ForeignKey(Group,
+                              blank=True,
+                              null=True,
+                              on_delete=models.SET_NULL,
+                              related_name='archived_posts')
+    image = models.ImageField('Картинка',
+                              upload_to='posts/',
+                              storage=ContentAddressedStorage(),
+                              db_index=True,
+                              blank=True)
+    image_width = models.PositiveIntegerField(null=True, blank=True)
+    image_height = models.PositiveIntegerField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=1)
+    archived = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.text[:15]
+
+    class Meta:
+        ordering = ['-pub_date']
+
+
+class ArchivedComment(models.Model):
+    post = models.ForeignKey(ArchivedPost,
+                             on_delete=models.CASCADE,
+                             related_name='comments')
+    author = models.ForeignKey(User,
+                               on_delete=models.CASCADE,
+                               related_name='archived_comments')
+    text = models.TextField()
+    created = models.DateTimeField()
+
+    def __str__(self):
+        return self.text[:15]
+
+    class Meta:
+        ordering = ['-created']
+
+
 class Follow(models.Model):
     user = models.ForeignKey(User,
                              on_delete=models.CASCADE,
@@ -67,3 +138,54 @@ class Follow(models.Model):
                 name='unique follow'
             )
         ]
+
+
+class Notification(models.Model):
+    """Непрочитанные события одного вида склеиваются в одну запись."""
+    COMMENT = 'comment'
+    FOLLOW = 'follow'
+    KINDS = (
+        (COMMENT, 'Новые комментарии'),
+        (FOLLOW, 'Новые подписчики'),
+    )
+
+    recipient = models.ForeignKey(User,
+                                  on_delete=models.CASCADE,
+                                  related_name='notifications')
+    kind = models.CharField(max_length=10, choices=KINDS)
+    post = models.ForeignKey(Post,
+                             null=True,
+                             blank=True,
+                             on_delete=models.CASCADE,
+                             related_name='notifications')
+    # Последний, кто вызвал событие
+    actor = models.ForeignKey(User,
+                              null=True,
+                              on_delete=models.SET_NULL,
+                              related_name='+')
+    count = models.PositiveIntegerField(default=1)
+    read = models.BooleanField(default=False)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated']
+        indexes = [
+            models.Index(
+                fields=['recipient', '-updated'],
+                name='notification_inbox_idx'
+            ),
+        ]
+        # NULL в post не совпадает сам с собой, поэтому для событий без
+        # поста нужно отдельное условие
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient', 'kind', 'post'],
+                condition=models.Q(read=False),
+                name='unique unread notification'
+            ),
+            models.UniqueConstraint(
+                fields=['recipient', 'kind'],
+                condition=models.Q(read=False, post__isnull=True),
+                name='unique unread notification without post'
+            ),
+        ]
@@ -0,0 +1,76 @@
+"""Массовые операции модерации частями по первичному ключу.
+
+Каждая часть обрабатывается одной задачей из posts.tasks, которая
+выполняет UPDATE или DELETE по списку id и возвращает число строк.
+Большие выборки целиком уходят в очередь задач.
+"""
+from django.conf import settings
+from django.db import models
+
+from core.page_cache import invalidate_pages
+
+from .hydration import forget_posts
+from .models import Notification, Post
+from .notifications import forget_unread_count
+from .snapshots import group_changed
+
+
+def id_chunks(queryset, size=None):
+    """Отдаёт id выборки частями, двигаясь по ключу без OFFSET."""
+    size = size or settings.MODERATION_CHUNK_SIZE
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    last = 0
+    while True:
+        chunk = list(ids.filter(pk__gt=last)[:size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def run_in_chunks(task, queryset, *args):
+    """Применяет задачу к выборке и возвращает (число строк, в фоне ли).
+
+    Для фоновой обработки возвращается число поставленных в очередь строк.
+    """
+    background = (
+        queryset.count() > settings.MODERATION_BACKGROUND_THRESHOLD
+    )
+    affected = 0
+    for chunk in id_chunks(queryset):
+        if background:
+            task.delay(chunk, *args)
+            affected += len(chunk)
+        else:
+            affected += task(chunk, *args)
+    return affected, background
+
+
+def delete_post_rows(post_ids):
+    """Удаляет посты и зависимые строки без загрузки объектов.
+
+    post_delete не отправляется, поэтому кэш страниц, снимки групп,
+    объекты ленты и счётчики уведомлений сбрасываются здесь один раз
+    на часть.
+    """
+    posts = Post.objects.filter(pk__in=post_ids)
+    groups = set(posts.exclude(group=None).values_list('group_id', flat=True))
+    recipients = set(Notification.objects.filter(
+        post_id__in=post_ids, read=False
+    ).values_list('recipient_id', flat=True))
+    for relation in Post._meta.related_objects:
+        related = relation.related_model._base_manager.filter(
+            **{f'{relation.field.name}__in': post_ids}
+        )
+        if relation.on_delete is models.CASCADE:
+            related._raw_delete(related.db)
+        elif relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+    deleted = posts._raw_delete(posts.db)
+    forget_posts(post_ids)
+    for group_id in groups:
+        group_changed(group_id)
+    for recipient_id in recipients:
+        forget_unread_count(recipient_id)
+    invalidate_pages()
+    return deleted
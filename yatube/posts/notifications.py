@@ -0,0 +1,74 @@
+"""Уведомления о новых комментариях и подписчиках.
+
+Пока событие не прочитано, повторные события того же вида по тому же
+посту склеиваются в одну запись со счётчиком («5 новых комментариев»).
+Число непрочитанных для значка в шапке берётся из кэша и сбрасывается
+при новом событии и отметке о прочтении.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Notification
+
+UNREAD_KEY = 'notifications:unread:{user_id}'
+
+
+def forget_unread_count(user_id):
+    cache.delete(UNREAD_KEY.format(user_id=user_id))
+
+
+def notify(recipient_id, kind, actor_id, post_id=None):
+    unread = Notification.objects.filter(
+        recipient_id=recipient_id, kind=kind, post_id=post_id, read=False
+    )
+    changes = {
+        'count': F('count') + 1,
+        'actor_id': actor_id,
+        'updated': timezone.now(),
+    }
+    if not unread.update(**changes):
+        try:
+            with transaction.atomic():
+                Notification.objects.create(
+                    recipient_id=recipient_id,
+                    kind=kind,
+                    post_id=post_id,
+                    actor_id=actor_id,
+                )
+        except IntegrityError:
+            # Запись успел создать параллельный запрос
+            unread.update(**changes)
+    forget_unread_count(recipient_id)
+
+
+def unread_count(user):
+    key = UNREAD_KEY.format(user_id=user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            recipient=user, read=False
+        ).aggregate(total=Sum('count'))['total'] or 0
+        cache.set(key, count, settings.NOTIFICATIONS_CACHE_TIMEOUT)
+    return count
+
+
+def inbox(user):
+    """Последние уведомления одним запросом по индексу получателя."""
+    return list(
+        Notification.objects.filter(recipient=user).select_related(
+            'post', 'actor'
+        )[:settings.NOTIFICATIONS_INBOX_SIZE]
+    )
+
+
+def mark_read(user, ids=None):
+    """Отмечает прочитанными выбранные или все уведомления."""
+    unread = Notification.objects.filter(recipient=user, read=False)
+    if ids is not None:
+        unread = unread.filter(pk__in=ids)
+    marked = unread.update(read=True)
+    forget_unread_count(user.pk)
+    return marked
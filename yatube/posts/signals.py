@@ -0,0 +1,217 @@
+import time
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.metrics import Counter
+from core.page_cache import invalidate_pages
+
+from . import hydration, live, notifications, snapshots, trending
+from .cards import bump_card_version
+from .choices import invalidate_group_choices
+from .models import Comment, Follow, Group, Notification, Post, User
+from .tasks import generate_image_variants, release_image
+
+DISPLAY_NAME_FIELDS = ('username', 'first_name', 'last_name')
+# Поля поста, которые видны в карточке
+CARD_FIELDS = frozenset({
+    'text', 'pub_date', 'author', 'author_id', 'group', 'group_id',
+    'image', 'image_width', 'image_height',
+})
+WRITES = Counter(
+    'yatube_writes_total', 'Созданные посты, комментарии и подписки',
+    ('model',),
+)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Follow)
+def count_writes(sender, created, **kwargs):
+    if created:
+        WRITES.inc(model=sender._meta.model_name)
+
+
+@receiver(post_save, sender=Comment)
+def score_comment(sender, instance, created, **kwargs):
+    if created:
+        trending.record_comment(instance)
+
+
+@receiver(post_save, sender=Follow)
+def score_follow(sender, instance, created, **kwargs):
+    if created:
+        trending.record_follow(instance)
+
+
+@receiver(post_save, sender=Post)
+def publish_new_post(sender, instance, created, **kwargs):
+    # Клиенты сразу запросят карточку, поэтому только после коммита
+    if created:
+        transaction.on_commit(lambda: live.publish_post(instance))
+
+
+@receiver(post_save, sender=Comment)
+def notify_about_comment(sender, instance, created, **kwargs):
+    author_id = instance.post.author_id
+    if created and author_id != instance.author_id:
+        notifications.notify(
+            author_id, Notification.COMMENT, instance.author_id,
+            post_id=instance.post_id,
+        )
+
+
+@receiver(post_delete, sender=Post)
+def forget_unread_on_post_delete(sender, instance, **kwargs):
+    # Уведомления о посте удалены каскадом, счётчик надо пересчитать
+    notifications.forget_unread_count(instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+def notify_about_follower(sender, instance, created, **kwargs):
+    if created:
+        notifications.notify(
+            instance.author_id, Notification.FOLLOW, instance.user_id
+        )
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=Follow)
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_cached_pages(sender, **kwargs):
+    invalidate_pages()
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_cached_group_choices(sender, **kwargs):
+    invalidate_group_choices()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_pages_on_user_change(sender, **kwargs):
+    # Вход пользователя обновляет только last_login, страницы не меняются
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    invalidate_pages()
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, update_fields, **kwargs):
+    instance.previous_image = None
+    instance.previous_group_id = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {'image', 'group'} & set(
+        update_fields
+    ):
+        instance.previous_image = instance.image.name
+        instance.previous_group_id = instance.group_id
+        return
+    previous = Post.objects.filter(
+        pk=instance.pk
+    ).values_list('image', 'group_id').first()
+    if previous is not None:
+        instance.previous_image, instance.previous_group_id = previous
+
+
+@receiver(post_save, sender=Post)
+def process_changed_image(sender, instance, **kwargs):
+    if instance.previous_image == instance.image.name:
+        return
+    if instance.previous_image:
+        release_image.delay(instance.previous_image, time.time())
+    if instance.image:
+        generate_image_variants.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    if instance.image:
+        release_image.delay(instance.image.name, time.time())
+
+
+@receiver(post_save, sender=Post)
+def update_group_snapshots(sender, instance, created, **kwargs):
+    if not created and instance.previous_group_id == instance.group_id:
+        return
+    if not created and instance.previous_group_id:
+        snapshots.group_changed(instance.previous_group_id)
+    if instance.group_id:
+        snapshots.group_changed(instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_group_snapshot(sender, instance, **kwargs):
+    if instance.group_id:
+        snapshots.group_changed(instance.group_id)
+
+
+@receiver([post_save, post_delete], sender=Group)
+def drop_group_snapshot(sender, instance, **kwargs):
+    # Новая группа может получить id удалённой, старый снимок ей не годится
+    snapshots.drop_snapshot(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def forget_hydrated_post(sender, instance, **kwargs):
+    hydration.forget('post', [instance.pk])
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_hydrated_author(sender, instance, **kwargs):
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    hydration.forget('author', [instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Group)
+def forget_hydrated_group(sender, instance, **kwargs):
+    hydration.forget('group', [instance.pk])
+
+
+@receiver(pre_save, sender=Post)
+def bump_post_version(sender, instance, update_fields, **kwargs):
+    if not instance._state.adding and update_fields is None:
+        instance.version += 1
+
+
+@receiver(post_save, sender=Post)
+def bump_post_version_on_partial_save(sender, instance, created,
+                                      update_fields, **kwargs):
+    # update_fields в pre_save не расширить, поэтому версия пишется отдельно
+    if created or not update_fields or not CARD_FIELDS & update_fields:
+        return
+    Post.objects.filter(pk=instance.pk).update(version=F('version') + 1)
+    instance.version += 1
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_display_name(sender, instance, update_fields,
+                                   **kwargs):
+    instance.previous_display_name = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(DISPLAY_NAME_FIELDS) & set(
+        update_fields
+    ):
+        return
+    instance.previous_display_name = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*DISPLAY_NAME_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def bump_versions_on_rename(sender, instance, created, **kwargs):
+    previous = getattr(instance, 'previous_display_name', None)
+    current = tuple(getattr(instance, field) for field in DISPLAY_NAME_FIELDS)
+    if not created and previous is not None and previous != current:
+        bump_card_version('author', instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def bump_versions_on_group_change(sender, instance, created, **kwargs):
+    if not created:
+        bump_card_version('group', instance.pk)
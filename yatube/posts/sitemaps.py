@@ -0,0 +1,151 @@
+"""Индекс sitemap и шарды по диапазонам первичных ключей.
+
+Шард n раздела содержит объекты с ключом от n * SITEMAP_SHARD_SIZE
+до (n + 1) * SITEMAP_SHARD_SIZE, поэтому он читается одним проходом по
+индексу без OFFSET. lastmod берётся из pub_date постов. Архивные посты
+сохраняют адрес, поэтому входят в шарды раздела posts наравне с обычными.
+"""
+from heapq import merge
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+
+from .models import ArchivedPost, Group, Post, User
+
+# Поле поста, по которому пост относится к шарду раздела
+SHARD_KEYS = {
+    'posts': 'pk',
+    'groups': 'group_id',
+    'profiles': 'author_id',
+}
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def shard_range(shard):
+    size = settings.SITEMAP_SHARD_SIZE
+    return shard * size, (shard + 1) * size
+
+
+def shard_lastmods(section):
+    models = (Post, ArchivedPost) if section == 'posts' else (Post,)
+    lastmods = {}
+    for model in models:
+        rows = model.objects.filter(
+            **{f'{SHARD_KEYS[section]}__isnull': False}
+        ).annotate(
+            shard=F(SHARD_KEYS[section]) / settings.SITEMAP_SHARD_SIZE
+        ).order_by('shard').values_list('shard').annotate(
+            lastmod=Max('pub_date')
+        )
+        for shard, lastmod in rows:
+            lastmods[shard] = max(lastmod, lastmods.get(shard, lastmod))
+    return sorted(lastmods.items())
+
+
+def post_entries(start, stop):
+    rows = merge(*(
+        model.objects.filter(
+            pk__gte=start, pk__lt=stop
+        ).order_by('pk').values_list('pk', 'pub_date').iterator()
+        for model in (Post, ArchivedPost)
+    ))
+    for pk, pub_date in rows:
+        yield reverse('posts:post_detail', args=(pk,)), pub_date
+
+
+def group_entries(start, stop):
+    rows = Group.objects.filter(
+        pk__gte=start, pk__lt=stop
+    ).annotate(
+        lastmod=Max('posts__pub_date')
+    ).filter(lastmod__isnull=False).order_by('pk').values_list(
+        'slug', 'lastmod'
+    )
+    for slug, lastmod in rows.iterator():
+        yield reverse('posts:group_list', args=(slug,)), lastmod
+
+
+def profile_entries(start, stop):
+    rows = User.objects.filter(
+        pk__gte=start, pk__lt=stop
+    ).annotate(
+        lastmod=Max('posts__pub_date')
+    ).filter(lastmod__isnull=False).order_by('pk').values_list(
+        'username', 'lastmod'
+    )
+    for username, lastmod in rows.iterator():
+        yield reverse('posts:profile', args=(username,)), lastmod
+
+
+ENTRIES = {
+    'posts': post_entries,
+    'groups': group_entries,
+    'profiles': profile_entries,
+}
+
+
+def render_index(request):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    for section in ENTRIES:
+        for shard, lastmod in shard_lastmods(section):
+            location = request.build_absolute_uri(reverse(
+                'posts:sitemap_section', args=(section, shard)
+            ))
+            yield (
+                f'<sitemap><loc>{escape(location)}</loc>'
+                f'<lastmod>{lastmod.isoformat()}</lastmod></sitemap>\n'
+            )
+    yield '</sitemapindex>\n'
+
+
+def render_section(request, section, shard):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    for path, lastmod in ENTRIES[section](*shard_range(shard)):
+        location = request.build_absolute_uri(path)
+        yield (
+            f'<url><loc>{escape(location)}</loc>'
+            f'<lastmod>{lastmod.isoformat()}</lastmod></url>\n'
+        )
+    yield '</urlset>\n'
+
+
+def cached_stream(key, chunks):
+    """Отдаёт части ответа по мере готовности и кэширует результат."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(parts), settings.SITEMAP_CACHE_TIMEOUT)
+
+
+def sitemap_response(request, key, chunks):
+    # Адреса в sitemap абсолютные, поэтому кэш разделяется по хосту
+    key = f'{key}:{request.get_host()}'
+    content = cache.get(key)
+    if content is not None:
+        return HttpResponse(content, content_type=CONTENT_TYPE)
+    return StreamingHttpResponse(
+        cached_stream(key, chunks),
+        content_type=CONTENT_TYPE,
+    )
+
+
+def sitemap_index(request):
+    return sitemap_response(request, 'sitemap:index', render_index(request))
+
+
+def sitemap_section(request, section, shard):
+    if section not in ENTRIES:
+        raise Http404
+    return sitemap_response(
+        request,
+        f'sitemap:{section}:{shard}',
+        render_section(request, section, shard),
+    )
@@ -0,0 +1,91 @@
+"""Снимки первых постов групп для страницы group_posts.
+
+Снимок хранит до GROUP_SNAPSHOT_SIZE пар (дата, id) самых новых постов
+группы и общее число её постов. Снимок не правится на месте: запись в
+группу меняет её версию, и следующий читатель собирает снимок из базы
+двумя индексными запросами. Версия меняется и после коммита, поэтому
+снимок, собранный параллельным читателем до коммита, остаётся под
+старым ключом и никем не читается. Массовые операции в обход сигналов
+сбрасывают все снимки сменой поколения.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .hydration import hydrate_posts
+from .models import Post
+
+GENERATION_KEY = 'group_snapshot:generation'
+VERSION_KEY = 'group_snapshot:version:{group_id}'
+
+
+def snapshot_key(group_id):
+    generation = cache.get_or_set(GENERATION_KEY, uuid.uuid4().hex, None)
+    version = cache.get_or_set(
+        VERSION_KEY.format(group_id=group_id), uuid.uuid4().hex, None
+    )
+    return f'group_snapshot:{generation}:{group_id}:{version}'
+
+
+def snapshot_entry(pub_date, post_id):
+    # Отрицательные значения дают сортировку от новых к старым
+    return (-pub_date.timestamp(), -post_id)
+
+
+def build_snapshot(group_id):
+    posts = Post.objects.filter(group_id=group_id)
+    entries = [
+        snapshot_entry(pub_date, pk)
+        for pub_date, pk in posts.order_by('-pub_date', '-pk').values_list(
+            'pub_date', 'pk'
+        )[:settings.GROUP_SNAPSHOT_SIZE]
+    ]
+    if len(entries) < settings.GROUP_SNAPSHOT_SIZE:
+        count = len(entries)
+    else:
+        count = posts.count()
+    return {'entries': entries, 'count': count}
+
+
+def get_snapshot(group_id):
+    key = snapshot_key(group_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot(group_id)
+        cache.set(key, snapshot, settings.GROUP_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def drop_snapshot(group_id):
+    cache.set(VERSION_KEY.format(group_id=group_id), uuid.uuid4().hex, None)
+
+
+def group_changed(group_id):
+    """Сбрасывает снимок группы сейчас и ещё раз после коммита."""
+    drop_snapshot(group_id)
+    transaction.on_commit(lambda: drop_snapshot(group_id))
+
+
+def reset_group_snapshots():
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+class GroupPostList:
+    """Посты группы для Paginator: начало из снимка, хвост из базы."""
+
+    def __init__(self, group):
+        self.group = group
+        self.snapshot = get_snapshot(group.pk)
+
+    def count(self):
+        return self.snapshot['count']
+
+    def __getitem__(self, index):
+        ids = [-pk for _, pk in self.snapshot['entries']]
+        if index.stop > len(ids):
+            ids = self.group.posts.order_by(
+                '-pub_date', '-pk'
+            ).values_list('pk', flat=True)
+        return hydrate_posts(list(ids[index]))
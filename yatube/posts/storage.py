@@ -0,0 +1,86 @@
+import hashlib
+import os
+
+from django.core.files.base import File
+from django.core.files.storage import Storage, get_storage_class
+from django.core.signals import setting_changed
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+    """Хранит файлы под именем, вычисленным по их содержимому.
+
+    Одинаковые загрузки попадают в один файл, поэтому и миниатюры sorl
+    для них общие. Удалением файлов управляют сигналы модели; повторное
+    сохранение существующего файла обновляет его время изменения, чтобы
+    параллельное освобождение его не удалило. Сами файлы лежат в хранилище
+    DEFAULT_FILE_STORAGE, в тестах это память.
+    """
+
+    def __init__(self):
+        setting_changed.connect(self._reset_backend)
+
+    @cached_property
+    def backend(self):
+        return get_storage_class()()
+
+    def _reset_backend(self, setting, **kwargs):
+        if setting == 'DEFAULT_FILE_STORAGE':
+            self.__dict__.pop('backend', None)
+
+    def content_name(self, name, content):
+        digest = getattr(content, 'content_hash', None)
+        if digest is None:
+            sha256 = hashlib.sha256()
+            for chunk in content.chunks():
+                sha256.update(chunk)
+            digest = sha256.hexdigest()
+            content.seek(0)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(
+            os.path.dirname(name), digest[:2], f'{digest}{extension}'
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            self.touch(name)
+            return name
+        return self.backend.save(name, content, max_length=max_length)
+
+    def touch(self, name):
+        touch = getattr(self.backend, 'touch', None)
+        if touch is not None:
+            touch(name)
+        else:
+            os.utime(self.backend.path(name))
+
+    def _open(self, name, mode='rb'):
+        return self.backend.open(name, mode)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def delete(self, name):
+        self.backend.delete(name)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
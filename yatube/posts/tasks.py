@@ -0,0 +1,82 @@
+import time
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.db.models import F
+
+from core.page_cache import invalidate_pages
+from taskqueue.queue import task
+
+from .hydration import forget_posts
+from .images import image_variants
+from .models import ArchivedPost, Follow, Post
+from .moderation import delete_post_rows
+from .snapshots import reset_group_snapshots
+
+
+@task(priority=10, concurrency=4)
+def generate_image_variants(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None and post.image:
+        image_variants(post.image, post.image_width)
+
+
+@task(priority=-10)
+def release_image(name, released_at=None):
+    """Удаляет файл и его миниатюры, если на него не ссылается ни один пост.
+
+    Файл, сохранённый заново после released_at, мог получить пост, ещё
+    не зафиксированный в базе, поэтому он не удаляется.
+    """
+    if not name:
+        return
+    for model in (Post, ArchivedPost):
+        if model.objects.filter(image=name).exists():
+            return
+    from sorl.thumbnail import delete as delete_thumbnails
+    from sorl.thumbnail.images import ImageFile
+    storage = Post._meta.get_field('image').storage
+    if released_at is not None:
+        try:
+            modified = storage.get_modified_time(name).timestamp()
+        except FileNotFoundError:
+            modified = None
+        if modified is not None and modified > released_at:
+            return
+    try:
+        delete_thumbnails(ImageFile(name, storage))
+    except SuspiciousFileOperation:
+        # Путь вне MEDIA_ROOT: файл хранилищу не принадлежит
+        pass
+
+
+@task(priority=-5)
+def reassign_posts(post_ids, group_id):
+    updated = Post.objects.filter(pk__in=post_ids).update(
+        group_id=group_id, version=F('version') + 1
+    )
+    forget_posts(post_ids)
+    reset_group_snapshots()
+    invalidate_pages()
+    return updated
+
+
+@task(priority=-5)
+def delete_posts(post_ids):
+    """Удаляет посты с комментариями и освобождает их картинки."""
+    images = set(Post.objects.filter(pk__in=post_ids).exclude(
+        image=''
+    ).values_list('image', flat=True))
+    with transaction.atomic():
+        deleted = delete_post_rows(post_ids)
+        for name in images:
+            release_image.delay(name, time.time())
+    return deleted
+
+
+@task(priority=-5)
+def delete_follows(follow_ids):
+    follows = Follow.objects.filter(pk__in=follow_ids)
+    deleted = follows._raw_delete(follows.db)
+    invalidate_pages()
+    return deleted
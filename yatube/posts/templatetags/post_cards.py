@@ -0,0 +1,14 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Список HTML карточек постов, промахи кэша отрисовываются разом."""
+    request = context.get('request')
+    feed = getattr(getattr(request, 'resolver_match', None), 'url_name', '')
+    return [mark_safe(card) for card in render_cards(posts, feed)]
@@ -0,0 +1,36 @@
+from django import template
+from django.conf import settings
+
+from ..images import MIME_TYPES, image_variants
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/responsive_image.html')
+def responsive_image(post):
+    """Картинка поста с srcset из заранее построенных вариантов."""
+    if not post.image:
+        return {}
+    variants = image_variants(post.image, post.image_width)
+    if not variants:
+        return {}
+    sources = [
+        {
+            'type': MIME_TYPES[image_format],
+            'srcset': ', '.join(
+                f'{thumbnail.url} {width}w' for width, thumbnail in thumbnails
+            ),
+        }
+        for image_format, thumbnails in variants.items()
+    ]
+    width, height = settings.POST_THUMBNAIL_SIZE
+    # Последний формат самый совместимый, он же идёт в <img>
+    fallback = dict(list(variants.values())[-1])[width]
+    return {
+        'sources': sources[:-1],
+        'fallback': fallback,
+        'fallback_srcset': sources[-1]['srcset'],
+        'sizes': settings.POST_THUMBNAIL_SIZES,
+        'width': width,
+        'height': height,
+    }
@@ -0,0 +1,229 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.admin import ACTION_CHECKBOX_NAME
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.page_cache import pages_version
+from core.paginator import EstimatedCountPaginator
+from taskqueue.models import Task
+
+from ..choices import group_choices
+from ..models import Comment, Follow, Group, Post
+from ..tasks import release_image
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.groups = Group.objects.bulk_create(
+            Group(title=f'Группа {number}', slug=f'group-{number}')
+            for number in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(author=self.admin, text='Пост', group=self.groups[0])
+            for _ in range(count)
+        )
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(
+                reverse('admin:posts_post_changelist')
+            )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow(self):
+        """Число запросов списка постов не зависит от числа строк."""
+        self.create_posts(1)
+        self.changelist_queries()
+        expected = self.changelist_queries()
+        self.create_posts(20)
+        self.assertEqual(self.changelist_queries(), expected)
+
+    def test_group_choices_cached(self):
+        """Список групп кэшируется и сбрасывается при изменении групп."""
+        self.assertEqual(len(group_choices()), 5)
+        with self.assertNumQueries(0):
+            group_choices()
+        Group.objects.create(title='Новая', slug='new')
+        self.assertIn('Новая', dict(group_choices()).values())
+
+    def test_rejected_upload_not_saved(self):
+        """Отброшенная при загрузке картинка не даёт сохранить пост."""
+        post = Post.objects.create(author=self.admin, text='Пост')
+        response = self.admin_client.post(
+            reverse('admin:posts_post_change', args=(post.pk,)),
+            {
+                'text': 'Новый текст',
+                'author': self.admin.pk,
+                'image': SimpleUploadedFile(
+                    'broken.gif', b'GIF89a', 'image/gif'
+                ),
+            },
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Не удалось прочитать заголовок')
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Пост')
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=10)
+    def test_estimated_count(self):
+        """Без статистики СУБД и с фильтром число строк считается точно,
+        после ANALYZE берётся оценка."""
+        self.create_posts(12)
+        Post.objects.filter(
+            pk__in=Post.objects.order_by('pk').values('pk')[:2]
+        ).delete()
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        self.assertEqual(paginator.count, 10)
+        call_command('analyze_tables', stdout=StringIO())
+        self.create_posts(1)
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 10)
+        filtered = EstimatedCountPaginator(
+            Post.objects.filter(group=self.groups[0]), 10
+        )
+        self.assertEqual(filtered.count, 11)
+
+
+@override_settings(MODERATION_CHUNK_SIZE=2, TASKS_ALWAYS_EAGER=True)
+class ModerationActionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.bulk_create(
+            [Post(author=cls.spammer, text='Купите') for _ in range(5)]
+            + [
+                Post(author=cls.author, text='Купите'),
+                Post(author=cls.author, text='Пост'),
+            ]
+        )
+        *cls.spam, cls.copy, cls.post = Post.objects.order_by('pk')
+        Comment.objects.bulk_create(
+            Comment(post=post, author=cls.author, text='К')
+            for post in Post.objects.all()
+        )
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def run_action(self, changelist, action, objects, **data):
+        return self.admin_client.post(reverse(changelist), {
+            'action': action,
+            ACTION_CHECKBOX_NAME: [obj.pk for obj in objects],
+            **data,
+        }, follow=True)
+
+    def test_reassign_group(self):
+        """Выбранные посты переносятся в группу одним запросом на часть."""
+        response = self.run_action(
+            'admin:posts_post_changelist', 'reassign_group',
+            self.spam, group=self.group.pk,
+        )
+        self.assertContains(response, 'Перенесено постов: 5.')
+        self.assertEqual(self.group.posts.count(), 5)
+        response = self.run_action(
+            'admin:posts_post_changelist', 'reassign_group', self.spam,
+        )
+        self.assertContains(response, 'Выберите группу для переноса.')
+
+    def test_delete_by_author(self):
+        """Удаляются все посты авторов выбранных постов с комментариями."""
+        response = self.run_action(
+            'admin:posts_post_changelist', 'delete_by_author',
+            self.spam[:1],
+        )
+        self.assertContains(response, 'Удалено постов: 5.')
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
+        self.assertEqual(Comment.objects.count(), 2)
+
+    @override_settings(MODERATION_CHUNK_SIZE=10, TASKS_ALWAYS_EAGER=False)
+    def test_delete_without_loading_objects(self):
+        """Удаление идёт без post_delete, кэши сбрасываются один раз,
+        а каждая картинка освобождается одной задачей."""
+        deleted = []
+
+        def collect(sender, **kwargs):
+            deleted.append(sender)
+
+        Post.objects.filter(author=self.spammer).update(
+            image='posts/spam.gif', group=self.group
+        )
+        version = pages_version()
+        post_delete.connect(collect)
+        self.addCleanup(post_delete.disconnect, collect)
+        self.run_action(
+            'admin:posts_post_changelist', 'delete_by_author',
+            self.spam[:1],
+        )
+        self.assertEqual(deleted, [])
+        self.assertFalse(Comment.objects.filter(post__in=self.spam).exists())
+        self.assertNotEqual(pages_version(), version)
+        self.assertEqual(
+            Task.objects.filter(name=release_image.name).count(), 1
+        )
+
+    def test_purge_spam(self):
+        """Удаляются все посты с тем же текстом, включая чужие."""
+        response = self.run_action(
+            'admin:posts_post_changelist', 'purge_spam', self.spam[:1],
+        )
+        self.assertContains(response, 'Удалено постов: 6.')
+        self.assertEqual(list(Post.objects.all()), [self.post])
+
+    @override_settings(
+        MODERATION_BACKGROUND_THRESHOLD=3, TASKS_ALWAYS_EAGER=False
+    )
+    def test_large_selection_queued(self):
+        """Большая выборка обрабатывается фоновыми задачами."""
+        response = self.run_action(
+            'admin:posts_post_changelist', 'delete_by_author',
+            self.spam[:1],
+        )
+        self.assertContains(
+            response, 'Удалено постов в фоне, поставлено в очередь: 5.'
+        )
+        self.assertEqual(Post.objects.filter(author=self.spammer).count(), 5)
+        call_command(
+            'run_worker', processes=0, once=True, stdout=StringIO()
+        )
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
+
+    def test_delete_by_follower(self):
+        """Удаляются все подписки выбранных подписчиков."""
+        follow = Follow.objects.create(user=self.spammer, author=self.author)
+        Follow.objects.create(user=self.spammer, author=self.admin)
+        Follow.objects.create(user=self.author, author=self.spammer)
+        response = self.run_action(
+            'admin:posts_follow_changelist', 'delete_by_follower', [follow],
+        )
+        self.assertContains(response, 'Удалено подписок: 2.')
+        self.assertEqual(Follow.objects.count(), 1)
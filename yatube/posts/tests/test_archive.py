@@ -0,0 +1,109 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Старый пост {number}')
+            for number in range(3)
+        )
+        cls.old_posts = list(Post.objects.order_by('pk'))
+        Comment.objects.bulk_create(
+            Comment(post=post, author=cls.user, text=f'Комментарий {number}')
+            for number, post in enumerate(cls.old_posts)
+        )
+        for number, post in enumerate(cls.old_posts):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.now() - timedelta(days=400 - number)
+            )
+        cls.new_post = Post.objects.create(author=cls.user, text='Новый')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def archive(self):
+        out = StringIO()
+        call_command('archive_posts', days=365, batch_size=2, stdout=out)
+        return out.getvalue()
+
+    def test_command_moves_old_posts(self):
+        """Старые посты с комментариями переезжают в архив."""
+        self.assertIn('Перенесено в архив постов: 3', self.archive())
+        self.assertEqual(list(Post.objects.all()), [self.new_post])
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            sorted(ArchivedPost.objects.values_list('pk', flat=True)),
+            [post.pk for post in self.old_posts],
+        )
+        self.assertEqual(ArchivedComment.objects.count(), 3)
+        self.assertIn('Перенесено в архив постов: 0', self.archive())
+
+    def test_post_detail_falls_through_to_archive(self):
+        """Страница архивного поста открывается по прежнему адресу."""
+        self.archive()
+        post = self.old_posts[0]
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=(post.pk,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, post.text)
+        self.assertContains(response, 'Комментарий 0')
+        self.assertTrue(response.context['archived'])
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=(10 ** 6,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_profile_falls_through_to_archive(self):
+        """Профиль показывает архивные посты после горячих."""
+        self.archive()
+        response = self.guest_client.get(
+            reverse('posts:profile', args=(self.user.username,))
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 4)
+        self.assertEqual(
+            [post.text for post in page_obj],
+            ['Новый', 'Старый пост 2', 'Старый пост 1', 'Старый пост 0'],
+        )
+
+    def test_profile_archive_queries_do_not_grow(self):
+        """Архивные карточки профиля не добирают автора и группу по одной."""
+        url = reverse('posts:profile', args=(self.user.username,))
+
+        def queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                self.guest_client.get(url)
+            return len(captured)
+
+        self.archive()
+        expected = queries()
+        pub_date = timezone.now() - timedelta(days=500)
+        group = Group.objects.create(title='Группа', slug='group')
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(
+                id=1000 + number, author=self.user, group=group,
+                text='Архив', pub_date=pub_date,
+            )
+            for number in range(5)
+        )
+        self.assertEqual(queries(), expected)
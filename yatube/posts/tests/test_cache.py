@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
+        cls.user = User.objects.create_user(username='HasNoName')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый текст',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.authorized_client_author = Client()
+        self.authorized_client_author.force_login(self.author)
+        cache.clear()
+
+    def test_guest_page_served_from_cache(self):
+        """Повторный запрос гостя отдаётся из кэша без рендеринга."""
+        url = reverse('posts:index')
+        response = self.guest_client.get(url)
+        self.assertIsNotNone(response.context)
+        response = self.guest_client.get(url)
+        self.assertIsNone(response.context)
+        self.assertContains(response, self.post.text)
+        self.assertEqual(response['Vary'], 'Cookie')
+
+    def test_writes_invalidate_cache(self):
+        """Создание поста, комментария и подписки сбрасывает кэш."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        writes = (
+            lambda: Post.objects.create(author=self.user, text='Новый'),
+            lambda: Comment.objects.create(
+                post=self.post, author=self.user, text='Коммент'
+            ),
+            lambda: Follow.objects.create(
+                user=self.user, author=self.author
+            ),
+        )
+        for write in writes:
+            with self.subTest(write=write):
+                self.guest_client.get(url)
+                write()
+                response = self.guest_client.get(url)
+                self.assertIsNotNone(response.context)
+        self.assertContains(response, 'Коммент')
+
+    def test_holes_rendered_per_user(self):
+        """Пользовательские фрагменты отрисовываются поверх общего тела."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        edit_url = reverse('posts:post_edit', args=(self.post.pk,))
+        response = self.guest_client.get(url)
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+        self.assertNotContains(response, '<!--hole:')
+        response = self.authorized_client.get(url)
+        self.assertTemplateNotUsed(response, 'posts/post_detail.html')
+        self.assertContains(response, 'Пользователь: HasNoName')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertNotContains(response, edit_url)
+        response = self.authorized_client_author.get(url)
+        self.assertContains(response, 'Пользователь: auth')
+        self.assertContains(response, edit_url)
+
+    def test_follow_button_rendered_per_user(self):
+        """Кнопка подписки зависит от пользователя, а не от кэша."""
+        url = reverse('posts:profile', args=(self.author.username,))
+        unfollow_url = reverse(
+            'posts:profile_unfollow', args=(self.author.username,)
+        )
+        Follow.objects.create(user=self.user, author=self.author)
+        response = self.guest_client.get(url)
+        self.assertNotContains(response, unfollow_url)
+        response = self.authorized_client.get(url)
+        self.assertTemplateNotUsed(response, 'posts/profile.html')
+        self.assertContains(response, unfollow_url)
@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..cards import card_key, card_stats, render_cards
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой'
+        )
+        self.post = Post.objects.create(
+            author=self.user, text='Текст поста', group=self.group
+        )
+
+    def test_feeds_use_shared_card(self):
+        """Ленты отрисовывают посты общей карточкой из кэша."""
+        client = Client()
+        client.force_login(self.user)
+        other = User.objects.create_user(username='other')
+        self.user.follower.create(author=other)
+        followed = Post.objects.create(author=other, text='Подписка')
+        urls = {
+            reverse('posts:index'): self.post,
+            reverse('posts:group_list', args=(self.group.slug,)): self.post,
+            reverse('posts:profile', args=(self.user.username,)): self.post,
+            reverse('posts:follow_index'): followed,
+        }
+        for url, post in urls.items():
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertContains(
+                    response, reverse('posts:post_detail', args=(post.pk,))
+                )
+        stats = card_stats()
+        self.assertEqual(stats['index']['misses'], 2)
+        for feed in ('group_list', 'profile', 'follow_index'):
+            with self.subTest(feed=feed):
+                self.assertEqual(stats[feed], {
+                    'hits': 1, 'misses': 0, 'ratio': 1.0
+                })
+
+    def test_cards_cached_until_version_changes(self):
+        """Карточка берётся из кэша, правка поста меняет её ключ."""
+        self.assertIn('Текст поста', render_cards([self.post], 'index')[0])
+        with self.assertTemplateNotUsed('posts/includes/post_card.html'):
+            render_cards([self.post], 'index')
+        old_key = card_key(self.post)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertNotEqual(card_key(self.post), old_key)
+        self.assertIn('Новый текст', render_cards([self.post], 'index')[0])
+        self.assertEqual(
+            card_stats()['index'], {'hits': 1, 'misses': 2, 'ratio': 0.3333}
+        )
+
+    def test_partial_save_changes_key(self):
+        """update_fields с полем карточки меняет её ключ."""
+        key = card_key(self.post)
+        self.post.trending_score = 5
+        self.post.save(update_fields=['trending_score'])
+        self.assertEqual(card_key(self.post), key)
+        self.post.text = 'Новый текст'
+        self.post.save(update_fields=['text'])
+        self.assertNotEqual(card_key(self.post), key)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.version, 2)
+
+    def test_author_rename_changes_key(self):
+        """Переименование автора и правка группы меняют ключ карточки."""
+        key = card_key(self.post)
+        self.user.last_login = None
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(card_key(self.post), key)
+        # Прежнее имя и UPDATE пользователя, посты не обновляются
+        with self.assertNumQueries(2):
+            self.user.first_name = 'Алексей'
+            self.user.save()
+        self.assertNotEqual(card_key(self.post), key)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.version, 1)
+        self.assertIn('Алексей', render_cards([self.post], 'index')[0])
+        key = card_key(self.post)
+        with self.assertNumQueries(1):
+            self.group.title = 'Новое название'
+            self.group.save()
+        self.assertNotEqual(card_key(self.post), key)
+
+    def test_stats_for_staff(self):
+        """Доли попаданий кэша карточек доступны персоналу."""
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        response = client.get(reverse('posts:post_card_stats'))
+        self.assertEqual(response.json()['profile'], {
+            'hits': 0, 'misses': 0, 'ratio': None
+        })
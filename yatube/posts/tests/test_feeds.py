@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост в группе',
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user,
+            text='Пост без группы',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_feeds_contain_posts(self):
+        """Ленты содержат посты своей области."""
+        feeds = {
+            reverse('posts:feed'): (True, True),
+            reverse('posts:feed_atom'): (True, True),
+            reverse('posts:group_feed', args=(self.group.slug,)): (
+                True, False),
+            reverse('posts:group_feed_atom', args=(self.group.slug,)): (
+                True, False),
+            reverse('posts:profile_feed', args=(self.user.username,)): (
+                True, True),
+            reverse('posts:profile_feed_atom', args=(self.user.username,)): (
+                True, True),
+        }
+        for url, (in_group, other) in feeds.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                content = response.content.decode()
+                self.assertEqual(in_group, self.post.text in content)
+                self.assertEqual(other, self.other_post.text in content)
+                self.assertTrue(response.has_header('ETag'))
+                self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_feed_conditional_get(self):
+        """Опрос без новых постов получает 304, новый пост меняет ETag."""
+        url = reverse('posts:feed_atom')
+        etag = self.guest_client.get(url)['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        Post.objects.create(author=self.user, text='Совсем новый пост')
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Совсем новый пост')
+
+    def test_feed_changes_on_edit(self):
+        """Правка поста и переименование группы меняют ETag и ленту."""
+        url = reverse('posts:group_feed', args=(self.group.slug,))
+        etag = self.guest_client.get(url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Исправленный текст')
+        etag = response['ETag']
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Новое название')
+
+    def test_feed_not_modified_by_unrelated_writes(self):
+        """Комментарии и подписки не сбрасывают ETag ленты."""
+        url = reverse('posts:group_feed', args=(self.group.slug,))
+        etag = self.guest_client.get(url)['ETag']
+        Comment.objects.create(
+            post=self.other_post, author=self.user, text='Комментарий'
+        )
+        Follow.objects.create(
+            user=User.objects.create_user(username='reader'),
+            author=self.user,
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_unknown_group_feed(self):
+        """Лента несуществующей группы отдаёт 404."""
+        response = self.guest_client.get(
+            reverse('posts:group_feed', args=('unknown',))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
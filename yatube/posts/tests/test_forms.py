@@ -1,47 +1,39 @@
-import shutil
-import tempfile
+import hashlib
 from http import HTTPStatus
+from io import BytesIO
 
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
+from ..images import EXTENSIONS, output_format
 from ..models import Group, Post
 
 User = get_user_model()
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostCreateFormTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        cls.user = User.objects.create_user(username='auth')
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
+        cls.user = User.objects.create_user(username='HasNoName')
         cls.group = Group.objects.create(
             title='Тестовая группа',
             slug='Test-slug',
             description='Тестовое описание',
         )
         cls.post = Post.objects.create(
-            author=cls.user,
+            author=cls.author,
             text='Тестовый текст',
             group=cls.group,
         )
 
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
-
     def setUp(self):
         self.guest_client = Client()
-        self.user = User.objects.create_user(username='HasNoName')
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
-        self.author = PostCreateFormTests.user
         self.authorized_client_author = Client()
         self.authorized_client_author.force_login(self.author)
 
@@ -78,8 +70,13 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(new_post.text, form_data['text'])
         self.assertEqual(new_post.group.id, form_data['group'])
         self.assertEqual(new_post.author, self.user)
-        expected_image_name = f"posts/{form_data['image'].name}"
-        self.assertEqual(new_post.image.name, expected_image_name)
+        extension = EXTENSIONS[output_format()]
+        self.assertRegex(
+            new_post.image.name, rf'^posts/\w{{2}}/\w{{64}}\.{extension}$'
+        )
+        self.assertEqual(
+            (new_post.image_width, new_post.image_height), (2, 1)
+        )
 
     def test_form_update(self):
         post_count = Post.objects.count()
@@ -122,9 +119,116 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(
             update_post.author, self.author
         )
-        image_name = form_data['image'].name
-        expected_image_name = f'posts/{image_name}'
-        self.assertEqual(update_post.image.name, expected_image_name)
+        extension = EXTENSIONS[output_format()]
+        self.assertRegex(
+            update_post.image.name, rf'^posts/\w{{2}}/\w{{64}}\.{extension}$'
+        )
+
+    @override_settings(POST_IMAGE_MAX_SIZE=(100, 100))
+    def test_form_image_processed(self):
+        """Картинка уменьшается, перекодируется и теряет EXIF."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        buffer = BytesIO()
+        Image.new('RGB', (400, 200), 'red').save(buffer, 'JPEG', exif=exif)
+        uploaded = SimpleUploadedFile(
+            name='camera.jpg',
+            content=buffer.getvalue(),
+            content_type='image/jpeg',
+        )
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'text with photo', 'image': uploaded},
+        )
+        new_post = Post.objects.get(text='text with photo')
+        self.assertEqual(
+            (new_post.image_width, new_post.image_height), (100, 50)
+        )
+        with Image.open(new_post.image) as image:
+            self.assertEqual(image.size, (100, 50))
+            self.assertEqual(image.format, output_format())
+            self.assertFalse(image.getexif())
+
+    @override_settings(UPLOAD_MAX_FILE_SIZE=100)
+    def test_form_upload_too_large(self):
+        """Слишком большой файл обрывает загрузку с ошибкой в форме."""
+        post_count = Post.objects.count()
+        uploaded = SimpleUploadedFile(
+            name='large.gif',
+            content=b'GIF89a' + b'\x00' * 1000,
+            content_type='image/gif',
+        )
+        # Поле после файла не теряется, форма показывает ошибку
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'image': uploaded, 'text': 'text large'},
+        )
+        self.assertEqual(Post.objects.count(), post_count)
+        self.assertFormError(
+            response, 'form', 'image', 'Размер файла превышает 100\xa0байт.'
+        )
+        self.assertEqual(response.context['form']['text'].value(),
+                         'text large')
+
+    @override_settings(UPLOAD_MAX_REQUEST_SIZE=100)
+    def test_form_request_too_large(self):
+        """Слишком большой запрос отклоняется до чтения тела."""
+        post_count = Post.objects.count()
+        uploaded = SimpleUploadedFile(
+            name='large.gif',
+            content=b'GIF89a' + b'\x00' * 1000,
+            content_type='image/gif',
+        )
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'text large', 'image': uploaded},
+        )
+        self.assertEqual(
+            response.status_code, HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        )
+        self.assertEqual(Post.objects.count(), post_count)
+
+    def test_form_upload_not_image(self):
+        """Файл без заголовка картинки отбрасывается с ошибкой в форме."""
+        post_count = Post.objects.count()
+        uploaded = SimpleUploadedFile(
+            name='broken.gif',
+            content=b'GIF89a' + b'\x00' * 1000,
+            content_type='image/gif',
+        )
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'text broken', 'image': uploaded},
+        )
+        self.assertEqual(Post.objects.count(), post_count)
+        self.assertFormError(
+            response, 'form', 'image',
+            'Не удалось прочитать заголовок картинки.',
+        )
+
+    @override_settings(POST_IMAGE_FORMAT='JPEG')
+    def test_form_ingested_image_stored_as_is(self):
+        """Картинка без метаданных в нужном формате не перекодируется."""
+        buffer = BytesIO()
+        Image.new('RGB', (40, 20), 'red').save(buffer, 'JPEG')
+        content = buffer.getvalue()
+        uploaded = SimpleUploadedFile(
+            name='ready.jpg',
+            content=content,
+            content_type='image/jpeg',
+        )
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'text ready', 'image': uploaded},
+        )
+        new_post = Post.objects.get(text='text ready')
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(
+            new_post.image.name, f'posts/{digest[:2]}/{digest}.jpg'
+        )
+        self.assertEqual(
+            (new_post.image_width, new_post.image_height), (40, 20)
+        )
 
     def test_form_dont_create_by_guest_client(self):
         post_count = Post.objects.count()
@@ -144,34 +248,26 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(post_count, post_count_after_response)
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class CommentCreateFormTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        cls.user = User.objects.create_user(username='auth')
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
+        cls.user = User.objects.create_user(username='HasNoName')
         cls.group = Group.objects.create(
             title='Тестовая группа',
             slug='Test-slug',
             description='Тестовое описание',
         )
         cls.post = Post.objects.create(
-            author=cls.user,
+            author=cls.author,
             text='Тестовый текст',
             group=cls.group,
         )
 
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
-
     def setUp(self):
         self.guest_client = Client()
-        self.user = User.objects.create_user(username='HasNoName')
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
-        self.author = CommentCreateFormTests.user
         self.authorized_client_author = Client()
         self.authorized_client_author.force_login(self.author)
 
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..hydration import HydratedPosts, hydrate_posts
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class HydrationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}', group=cls.group)
+            for number in range(3)
+        )
+        cls.posts = list(Post.objects.order_by('pk'))
+        cls.ids = [post.pk for post in cls.posts]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_misses_fetched_in_batches(self):
+        """Промахи добираются одним запросом на вид, повтор идёт из кэша."""
+        with self.assertNumQueries(3):
+            posts = hydrate_posts(self.ids)
+        self.assertEqual(posts, self.posts)
+        with self.assertNumQueries(0):
+            posts = hydrate_posts(self.ids[::-1])
+            self.assertEqual(posts, self.posts[::-1])
+            self.assertEqual(posts[0].author.get_full_name(), 'Лев Толстой')
+            self.assertEqual(posts[0].group.slug, 'group')
+
+    def test_signals_invalidate_cache(self):
+        """Правка поста, автора или группы сбрасывает только свою запись."""
+        hydrate_posts(self.ids)
+        post = Post.objects.get(pk=self.ids[0])
+        post.text = 'Исправленный'
+        post.save()
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Алексей'
+        user.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'renamed'
+        group.save()
+        with self.assertNumQueries(3):
+            posts = hydrate_posts(self.ids)
+        self.assertEqual(posts[0].text, 'Исправленный')
+        self.assertEqual(posts[1].author.first_name, 'Алексей')
+        self.assertEqual(posts[2].group.slug, 'renamed')
+
+    def test_deleted_posts_skipped(self):
+        """Удалённые посты пропускаются, выборка читает из базы только id."""
+        hydrate_posts(self.ids)
+        Post.objects.get(pk=self.ids[1]).delete()
+        self.assertEqual(
+            hydrate_posts(self.ids), [self.posts[0], self.posts[2]]
+        )
+        with self.assertNumQueries(1):
+            posts = HydratedPosts(Post.objects.all())[0:2]
+        self.assertEqual(posts, [self.posts[2], self.posts[0]])
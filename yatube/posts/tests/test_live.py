@@ -0,0 +1,148 @@
+import json
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from core.pubsub import Hub
+
+from .. import live
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class HubTests(TestCase):
+    def test_topics_and_bounded_buffer(self):
+        """Подписчик получает только свои темы, буфер ограничен."""
+        hub = Hub()
+        with hub.subscribe({'a'}, size=2) as subscription:
+            hub.publish('b', 1)
+            self.assertEqual(subscription.get(), ([], False))
+            for event_id in range(2, 6):
+                hub.publish('a', event_id, {'n': event_id})
+            self.assertEqual(
+                subscription.get(), ([(4, {'n': 4}), (5, {'n': 5})], True)
+            )
+            self.assertEqual(subscription.get(), ([], False))
+        self.assertEqual(hub.subscribers(), 0)
+
+    def test_replay_after(self):
+        """Переподключившийся подписчик получает пропущенные события."""
+        hub = Hub(replay_size=3)
+        for event_id in range(1, 6):
+            hub.publish('a', event_id)
+        with hub.subscribe({'a'}, size=10, after=3) as subscription:
+            self.assertEqual(subscription.get(), ([(4, None), (5, None)],
+                                                  False))
+
+    def test_get_waits_for_event(self):
+        """get ждёт события, пока не истечёт таймаут."""
+        hub = Hub()
+        with hub.subscribe({'a'}, size=10) as subscription:
+            threading.Timer(0.05, hub.publish, ('a', 1)).start()
+            self.assertEqual(subscription.get(timeout=5), ([(1, None)],
+                                                           False))
+
+
+@override_settings(
+    LIVE_STREAM_SECONDS=0, LIVE_POLL_TIMEOUT=0, LIVE_BUSY_RETRY_MS=30000
+)
+class LiveFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        live.HUB.recent.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.posts = [
+            Post.objects.create(author=author, text=f'Пост {author}')
+            for author in (self.author, self.other, self.author)
+        ]
+        for post in self.posts:
+            live.publish_post(post)
+
+    def poll(self, client, **params):
+        response = client.get(reverse('posts:live_poll'), params)
+        return response.json()
+
+    def test_poll_delta(self):
+        """Long-poll отдаёт посты новее after, лента подписок — свои."""
+        first, second, third = self.posts
+        data = self.poll(self.client, after=first.pk)
+        self.assertEqual(data['ids'], [third.pk, second.pk])
+        self.assertEqual(data['count'], 2)
+        data = self.poll(self.reader_client, feed='follow_index', after=0)
+        self.assertEqual(data['ids'], [third.pk, first.pk])
+        self.assertEqual(self.poll(self.client)['count'], 0)
+        response = self.client.get(
+            reverse('posts:live_poll'), {'feed': 'follow_index'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_stream(self):
+        """Поток SSE продолжает с Last-Event-ID."""
+        response = self.client.get(
+            reverse('posts:live_stream'),
+            HTTP_LAST_EVENT_ID=str(self.posts[1].pk),
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'id: {self.posts[2].pk}\nevent: posts\n', body)
+        data = json.loads(body.split('data: ')[1])
+        self.assertEqual(data['ids'], [self.posts[2].pk])
+        self.assertEqual(live.HUB.subscribers(), 0)
+
+    @override_settings(LIVE_MAX_CONNECTIONS=1)
+    def test_connections_capped(self):
+        """Сверх лимита соединений поток и опрос получают 503."""
+        url = reverse('posts:live_stream')
+        first = self.client.get(url)
+        busy = self.client.get(url)
+        self.assertEqual(busy.status_code, 503)
+        self.assertEqual(busy['Retry-After'], '30')
+        self.assertContains(busy, 'retry: 30000', status_code=503)
+        self.assertEqual(
+            self.client.get(reverse('posts:live_poll')).status_code, 503
+        )
+        # Непрочитанный поток тоже освобождает слот при закрытии
+        first.close()
+        b''.join(self.client.get(url).streaming_content)
+        self.assertEqual(
+            self.client.get(reverse('posts:live_poll')).status_code, 200
+        )
+
+    @override_settings(LIVE_BUFFER_SIZE=2)
+    def test_overflow_asks_reload(self):
+        """Переполнение буфера просит клиента перезагрузить ленту."""
+        data = self.poll(self.client, after=0)
+        self.assertEqual(data['count'], 2)
+        self.assertTrue(data['reload'])
+
+    def test_new_posts_cards(self):
+        """Клиент забирает карточки только новых постов."""
+        ids = ','.join(str(post.pk) for post in self.posts[1:])
+        url = reverse('posts:live_posts')
+        response = self.client.get(url, {'ids': ids})
+        self.assertContains(response, 'Пост other')
+        self.assertEqual(response.content.count(b'<hr>'), 1)
+        with self.assertNumQueries(0):
+            self.client.get(url, {'ids': ids})
+
+
+class PublishOnCommitTests(TransactionTestCase):
+    def test_new_post_published(self):
+        """Новый пост попадает в шину после коммита."""
+        author = User.objects.create_user(username='author')
+        with live.HUB.subscribe({live.author_topic(author.pk)}, 10) as sub:
+            post = Post.objects.create(author=author, text='Пост')
+            self.assertEqual(sub.get(), ([(post.pk, None)], False))
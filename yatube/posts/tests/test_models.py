@@ -1,15 +1,26 @@
+import time
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 
 from ..models import Group, Post
+from ..tasks import release_image
 
 User = get_user_model()
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
 
 
 class PostModelTest(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         cls.user = User.objects.create_user(username='auth')
         cls.group = Group.objects.create(
             title='Тестовая группа',
@@ -34,3 +45,55 @@ class PostModelTest(TestCase):
         for expected_object, object in models_dict.items():
             with self.subTest(expected_object=expected_object):
                 self.assertEqual(expected_object, str(object))
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True)
+class PostImageStorageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+
+    def create_post(self, name):
+        return Post.objects.create(
+            author=PostImageStorageTest.user,
+            text='Тестовый текст',
+            image=SimpleUploadedFile(name, SMALL_GIF, 'image/gif'),
+        )
+
+    def test_identical_images_share_file(self):
+        """Одинаковые картинки хранятся одним файлом до удаления
+        последнего поста."""
+        first = self.create_post('first.gif')
+        second = self.create_post('second.gif')
+        self.assertEqual(first.image.name, second.image.name)
+        storage = first.image.storage
+        name = first.image.name
+        first.delete()
+        self.assertTrue(storage.exists(name))
+        second.delete()
+        self.assertFalse(storage.exists(name))
+
+    def test_replaced_image_released(self):
+        """Заменённая картинка удаляется, если больше не используется."""
+        post = self.create_post('first.gif')
+        storage = post.image.storage
+        name = post.image.name
+        post.image = SimpleUploadedFile(
+            'other.gif', SMALL_GIF.replace(b'\xFF', b'\x00'), 'image/gif'
+        )
+        post.save()
+        self.assertFalse(storage.exists(name))
+
+    def test_reuploaded_image_not_released(self):
+        """Файл, загруженный заново после освобождения, не удаляется."""
+        post = self.create_post('first.gif')
+        storage = post.image.storage
+        name = post.image.name
+        Post.objects.filter(pk=post.pk).update(image='')
+        released_at = time.time()
+        with storage.open(name) as file:
+            self.assertEqual(storage.save('posts/again.gif', file), name)
+        release_image(name, released_at)
+        self.assertTrue(storage.exists(name))
+        release_image(name, time.time())
+        self.assertFalse(storage.exists(name))
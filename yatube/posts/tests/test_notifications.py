@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Notification, Post
+from ..notifications import inbox, unread_count
+
+User = get_user_model()
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.readers = [
+            User.objects.create_user(username=f'reader-{number}')
+            for number in range(3)
+        ]
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def comment(self, author, count=1):
+        for _ in range(count):
+            Comment.objects.create(post=self.post, author=author, text='К')
+
+    def test_events_coalesced(self):
+        """Непрочитанные события склеиваются в одну запись со счётчиком."""
+        self.comment(self.readers[0], 3)
+        self.comment(self.readers[1], 2)
+        self.comment(self.author)
+        for reader in self.readers:
+            Follow.objects.create(user=reader, author=self.author)
+        comments, follows = (
+            Notification.objects.get(recipient=self.author, kind=kind)
+            for kind in (Notification.COMMENT, Notification.FOLLOW)
+        )
+        self.assertEqual(comments.count, 5)
+        self.assertEqual(comments.actor, self.readers[1])
+        self.assertEqual(follows.count, 3)
+        self.assertEqual(unread_count(self.author), 8)
+
+    def test_badge_from_cache(self):
+        """Счётчик непрочитанных берётся из кэша и сбрасывается событием."""
+        self.comment(self.readers[0], 2)
+        self.assertEqual(unread_count(self.author), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.author), 2)
+        self.comment(self.readers[0])
+        self.assertEqual(unread_count(self.author), 3)
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertContains(response, '<span class="badge bg-danger">3')
+
+    def test_inbox_single_query(self):
+        """Входящие читаются одним запросом вместе с постом и автором."""
+        self.comment(self.readers[0])
+        Follow.objects.create(user=self.readers[0], author=self.author)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [(item.kind, item.actor.username, item.post)
+                 for item in inbox(self.author)],
+                [(Notification.FOLLOW, 'reader-0', None),
+                 (Notification.COMMENT, 'reader-0', self.post)],
+            )
+        response = self.author_client.get(reverse('posts:notifications'))
+        self.assertContains(response, 'Новых комментариев: 1')
+        self.assertContains(response, 'Новых подписчиков: 1')
+
+    def test_mark_read(self):
+        """Выбранные или все уведомления отмечаются прочитанными."""
+        self.comment(self.readers[0], 2)
+        Follow.objects.create(user=self.readers[0], author=self.author)
+        follow = Notification.objects.get(kind=Notification.FOLLOW)
+        url = reverse('posts:notifications_read')
+        self.author_client.post(url)
+        self.assertEqual(unread_count(self.author), 3)
+        self.author_client.post(url, {'ids': [follow.pk]})
+        self.assertEqual(unread_count(self.author), 2)
+        Follow.objects.create(user=self.readers[1], author=self.author)
+        comment = Notification.objects.get(kind=Notification.COMMENT)
+        self.author_client.post(url, {'ids': [comment.pk], 'all': ''})
+        self.assertEqual(unread_count(self.author), 0)
+        self.comment(self.readers[1])
+        self.assertEqual(
+            Notification.objects.filter(kind=Notification.COMMENT).count(), 2
+        )
+        self.assertEqual(unread_count(self.author), 1)
+
+    def test_one_unread_row_without_post(self):
+        """Непрочитанное уведомление без поста у получателя одно."""
+        Follow.objects.create(user=self.readers[0], author=self.author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Notification.objects.create(
+                recipient=self.author, kind=Notification.FOLLOW
+            )
+        Notification.objects.update(read=True)
+        Notification.objects.create(
+            recipient=self.author, kind=Notification.FOLLOW
+        )
+
+    def test_badge_after_post_delete(self):
+        """Удаление поста сбрасывает счётчик его уведомлений."""
+        self.comment(self.readers[0], 2)
+        self.assertEqual(unread_count(self.author), 2)
+        Post.objects.get(pk=self.post.pk).delete()
+        self.assertEqual(unread_count(self.author), 0)
+
+    def test_only_recipient_marks_read(self):
+        """Чужие уведомления отметить нельзя."""
+        self.comment(self.readers[0])
+        notification = Notification.objects.get()
+        reader_client = Client()
+        reader_client.force_login(self.readers[0])
+        reader_client.post(
+            reverse('posts:notifications_read'), {'ids': [notification.pk]}
+        )
+        self.assertEqual(unread_count(self.author), 1)
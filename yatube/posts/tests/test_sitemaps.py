@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import ArchivedPost, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(SITEMAP_SHARD_SIZE=2)
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.silent = User.objects.create_user(username='silent')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}', group=cls.group)
+            for number in range(3)
+        )
+        cls.posts = list(Post.objects.order_by('pk'))
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def get_content(self, url):
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        if response.streaming:
+            return b''.join(response.streaming_content).decode()
+        return response.content.decode()
+
+    def test_index_lists_shards(self):
+        """Индекс ссылается на шарды, в которых есть записи."""
+        content = self.get_content(reverse('posts:sitemap'))
+        pks = [post.pk for post in self.posts]
+        shards = {pk // 2 for pk in pks}
+        for shard in shards:
+            with self.subTest(shard=shard):
+                self.assertIn(reverse(
+                    'posts:sitemap_section', args=('posts', shard)
+                ), content)
+        self.assertIn(reverse(
+            'posts:sitemap_section', args=('groups', self.group.pk // 2)
+        ), content)
+        self.assertEqual(content.count('<sitemap>'), len(shards) + 2)
+
+    def test_shards_contain_entries(self):
+        """Шард содержит только объекты своего диапазона ключей."""
+        for post in self.posts:
+            with self.subTest(post=post.pk):
+                content = self.get_content(reverse(
+                    'posts:sitemap_section', args=('posts', post.pk // 2)
+                ))
+                self.assertIn(reverse(
+                    'posts:post_detail', args=(post.pk,)
+                ), content)
+                self.assertIn(post.pub_date.isoformat(), content)
+                self.assertLessEqual(content.count('<url>'), 2)
+        content = self.get_content(reverse(
+            'posts:sitemap_section', args=('profiles', self.user.pk // 2)
+        ))
+        self.assertIn(reverse('posts:profile', args=('auth',)), content)
+        self.assertNotIn(reverse('posts:profile', args=('silent',)), content)
+
+    def test_archived_posts_listed(self):
+        """Архивные посты остаются в шардах раздела posts."""
+        archived = ArchivedPost.objects.create(
+            id=self.posts[-1].pk + 1,
+            author=self.user,
+            text='Архивный пост',
+            pub_date=self.posts[0].pub_date,
+        )
+        shard = archived.pk // 2
+        index = self.get_content(reverse('posts:sitemap'))
+        self.assertIn(reverse(
+            'posts:sitemap_section', args=('posts', shard)
+        ), index)
+        content = self.get_content(reverse(
+            'posts:sitemap_section', args=('posts', shard)
+        ))
+        self.assertIn(reverse(
+            'posts:post_detail', args=(archived.pk,)
+        ), content)
+
+    def test_shard_is_cached(self):
+        """Повторный запрос шарда отдаётся из кэша без запросов к БД."""
+        url = reverse('posts:sitemap_section', args=('posts', 0))
+        content = self.get_content(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_content(url), content)
+
+    def test_unknown_section(self):
+        """Неизвестный раздел отдаёт 404."""
+        response = self.guest_client.get(reverse(
+            'posts:sitemap_section', args=('unknown', 0)
+        ))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post
+from ..snapshots import GroupPostList, get_snapshot, snapshot_key
+
+User = get_user_model()
+
+
+@override_settings(GROUP_SNAPSHOT_SIZE=3)
+class GroupSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}', group=cls.group)
+            for number in range(4)
+        )
+        cls.posts = list(Post.objects.order_by('pk'))
+
+    def setUp(self):
+        cache.clear()
+
+    def snapshot_ids(self, group):
+        return [-pk for _, pk in get_snapshot(group.pk)['entries']]
+
+    def test_snapshot_keeps_newest_posts(self):
+        """Снимок хранит id самых новых постов и общее число постов."""
+        self.assertEqual(
+            self.snapshot_ids(self.group),
+            [post.pk for post in reversed(self.posts[1:])],
+        )
+        self.assertEqual(get_snapshot(self.group.pk)['count'], 4)
+
+    def test_snapshot_rebuilt_after_writes(self):
+        """Создание, смена группы и удаление поста пересобирают снимок."""
+        get_snapshot(self.group.pk)
+        get_snapshot(self.other_group.pk)
+        new_post = Post.objects.create(
+            author=self.user, text='Новый', group=self.group
+        )
+        self.assertEqual(self.snapshot_ids(self.group)[0], new_post.pk)
+        new_post.group = self.other_group
+        new_post.save()
+        self.assertNotIn(new_post.pk, self.snapshot_ids(self.group))
+        self.assertEqual(self.snapshot_ids(self.other_group), [new_post.pk])
+        Post.objects.get(pk=self.posts[3].pk).delete()
+        self.assertEqual(
+            self.snapshot_ids(self.group),
+            [post.pk for post in reversed(self.posts[:3])],
+        )
+        self.assertEqual(get_snapshot(self.group.pk)['count'], 3)
+
+    def test_stale_snapshot_not_served(self):
+        """Снимок, собранный до записи, лежит под ключом старой версии."""
+        key = snapshot_key(self.group.pk)
+        stale = get_snapshot(self.group.pk)
+        new_post = Post.objects.create(
+            author=self.user, text='Новый', group=self.group
+        )
+        # Параллельный читатель сохраняет снимок уже после записи
+        cache.set(key, stale)
+        self.assertEqual(self.snapshot_ids(self.group)[0], new_post.pk)
+
+    def test_old_post_moved_into_group(self):
+        """Старый пост, попавший в полную группу, не вытесняет новые."""
+        old_post = Post.objects.create(author=self.user, text='Старый')
+        Post.objects.filter(pk=old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=1)
+        )
+        old_post.refresh_from_db()
+        before = self.snapshot_ids(self.group)
+        old_post.group = self.group
+        old_post.save()
+        self.assertEqual(self.snapshot_ids(self.group), before)
+        self.assertEqual(get_snapshot(self.group.pk)['count'], 5)
+
+    def test_page_served_from_snapshot(self):
+        """Страница из снимка не читает базу, за хвостом идёт запрос id."""
+        posts = GroupPostList(self.group)
+        self.assertEqual(posts[0:4], self.posts[::-1])
+        with self.assertNumQueries(0):
+            self.assertEqual(posts[0:2], self.posts[:1:-1])
+        with self.assertNumQueries(1):
+            self.assertEqual(posts[2:4], self.posts[1::-1])
+
+    def test_group_page_uses_snapshot(self):
+        """Страница группы показывает посты в порядке снимка."""
+        response = Client().get(
+            reverse('posts:group_list', args=(self.group.slug,))
+        )
+        self.assertEqual(
+            list(response.context['page_obj']), self.posts[::-1]
+        )
@@ -0,0 +1,125 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import (ArchivedComment, ArchivedPost, Comment, Follow, Group,
+                      Post)
+
+User = get_user_model()
+
+
+class TransferCommandsTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test-slug',
+            description='Тестовое описание',
+        )
+        self.post = Post.objects.create(
+            author=self.author,
+            text='Тестовый текст, с "кавычками"\nи переносом',
+            group=self.group,
+        )
+        self.pub_date = datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        Post.objects.filter(pk=self.post.pk).update(pub_date=self.pub_date)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, 'posts.dump')
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, self.path)
+
+    def export_and_import(self, output_format):
+        call_command(
+            'export_posts', format=output_format, output=self.path,
+            stderr=StringIO(),
+        )
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        call_command(
+            'import_posts', self.path, format=output_format, batch_size=1,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+
+    def assert_imported(self):
+        post = Post.objects.get()
+        self.assertEqual(post.text, self.post.text)
+        self.assertEqual(post.pub_date, self.pub_date)
+        self.assertEqual(post.author.username, 'auth')
+        self.assertFalse(post.author.is_active)
+        self.assertEqual(post.group.slug, self.group.slug)
+        comment = Comment.objects.get()
+        self.assertEqual(comment.post, post)
+        self.assertEqual(comment.author.username, 'reader')
+        self.assertTrue(Follow.objects.filter(
+            user__username='reader', author__username='auth'
+        ).exists())
+
+    def test_ndjson_round_trip(self):
+        """Выгрузка NDJSON загружается обратно с сохранением связей."""
+        self.export_and_import('ndjson')
+        self.assert_imported()
+
+    def test_csv_round_trip(self):
+        """Выгрузка CSV загружается обратно с сохранением связей."""
+        self.export_and_import('csv')
+        self.assert_imported()
+
+    def test_import_into_populated_database(self):
+        """Повторный импорт не конфликтует с уже существующими id."""
+        call_command(
+            'export_posts', output=self.path, stderr=StringIO(),
+        )
+        call_command(
+            'import_posts', self.path,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            Post.objects.exclude(pk=self.post.pk).get().comments.count(), 1
+        )
+
+    def test_import_skips_archived_ids(self):
+        """Импортированный пост не получает id поста из архива."""
+        call_command(
+            'export_posts', output=self.path, stderr=StringIO(),
+        )
+        call_command(
+            'archive_posts', days=365, batch_size=10, stdout=StringIO()
+        )
+        self.assertFalse(Post.objects.exists())
+        call_command(
+            'import_posts', self.path,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+        self.assertGreater(
+            Post.objects.get().pk, ArchivedPost.objects.get().pk
+        )
+
+    def test_archive_round_trip(self):
+        """Архивные посты с комментариями выгружаются и загружаются."""
+        call_command(
+            'archive_posts', days=365, batch_size=10, stdout=StringIO()
+        )
+        for output_format in ('ndjson', 'csv'):
+            with self.subTest(format=output_format):
+                self.export_and_import(output_format)
+                self.assertFalse(Post.objects.exists())
+                archived = ArchivedPost.objects.get()
+                self.assertEqual(archived.text, self.post.text)
+                self.assertEqual(archived.pub_date, self.pub_date)
+                self.assertEqual(archived.group.slug, self.group.slug)
+                comment = ArchivedComment.objects.get()
+                self.assertEqual(comment.post, archived)
+                self.assertEqual(comment.author.username, 'reader')
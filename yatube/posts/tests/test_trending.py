@@ -0,0 +1,93 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Comment, Follow, Post
+from ..trending import trending_ids
+
+User = get_user_model()
+
+
+@override_settings(
+    TRENDING_COMMENT_WEIGHT=1,
+    TRENDING_FOLLOW_WEIGHT=2,
+    TRENDING_HALF_LIFE_HOURS=1,
+    TRENDING_MIN_SCORE=0.3,
+)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.quiet, self.discussed, self.followed = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+
+    def comment(self, post, count=1):
+        for _ in range(count):
+            Comment.objects.create(post=post, author=self.reader, text='К')
+
+    def score(self, post):
+        post.refresh_from_db(fields=['trending_score'])
+        return post.trending_score
+
+    def test_comments_and_follows_raise_score(self):
+        """Комментарий поднимает пост, подписка — свежие посты автора."""
+        self.comment(self.discussed, 3)
+        self.assertEqual(self.score(self.discussed), 3)
+        Post.objects.filter(pk=self.quiet.pk).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.score(self.discussed), 5)
+        self.assertEqual(self.score(self.followed), 2)
+        self.assertEqual(self.score(self.quiet), 0)
+        self.assertEqual(
+            trending_ids(), [self.discussed.pk, self.followed.pk]
+        )
+
+    def test_repeated_follow_scored_once(self):
+        """Повторная подписка после отписки не поднимает посты снова."""
+        for _ in range(3):
+            Follow.objects.create(user=self.reader, author=self.author)
+            Follow.objects.filter(
+                user=self.reader, author=self.author
+            ).delete()
+        self.assertEqual(self.score(self.followed), 2)
+
+    def test_decay(self):
+        """Счета затухают, а совсем малые обнуляются."""
+        self.comment(self.discussed, 4)
+        self.comment(self.followed)
+        out = StringIO()
+        call_command('decay_trending', hours=1, stdout=out)
+        self.assertEqual(self.score(self.discussed), 2)
+        self.assertEqual(self.score(self.followed), 0.5)
+        call_command('decay_trending', hours=1, stdout=out)
+        self.assertEqual(self.score(self.followed), 0)
+        self.assertIn('Популярных постов после затухания: 1', out.getvalue())
+        self.assertEqual(trending_ids(), [self.discussed.pk])
+
+    def test_trending_page(self):
+        """Страница показывает посты по убыванию счёта одним запросом."""
+        self.comment(self.followed, 2)
+        self.comment(self.discussed)
+        url = reverse('posts:trending')
+        with self.assertNumQueries(1):
+            trending_ids()
+        response = Client().get(url)
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [self.followed, self.discussed],
+        )
+        self.assertContains(response, 'Популярные посты')
@@ -1,25 +1,19 @@
-import shutil
-import tempfile
-
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase, override_settings
+from django.test import Client, TestCase
 from django.urls import reverse
 
 from ..models import Follow, Group, Post
 
 User = get_user_model()
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostViewsTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
         small_gif = (
             b'\x47\x49\x46\x38\x39\x61\x02\x00'
             b'\x01\x00\x80\x00\x00\x00\x00\x00'
@@ -33,30 +27,24 @@ class PostViewsTests(TestCase):
             content=small_gif,
             content_type='image/gif',
         )
-        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='auth')
+        cls.user = User.objects.create_user(username='HasNoName')
         cls.group = Group.objects.create(
             title='Тестовая группа',
             slug='Test-slug',
             description='Тестовое описание',
         )
         cls.post = Post.objects.create(
-            author=cls.user,
+            author=cls.author,
             text='Тестовый текст',
             group=cls.group,
             image=uploaded,
         )
 
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
-
     def setUp(self):
         self.guest_client = Client()
-        self.user = User.objects.create_user(username='HasNoName')
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
-        self.author = PostViewsTests.user
         self.authorized_client_author = Client()
         self.authorized_client_author.force_login(self.author)
         cache.clear()
@@ -87,7 +75,7 @@ class PostViewsTests(TestCase):
                 self.assertEqual(response.context['page_obj'][0], new_post)
         response = self.authorized_client_author.get(
             reverse('posts:profile', kwargs={
-                'username': PostViewsTests.user.username}
+                'username': self.author.username}
             )
         )
         self.assertNotEqual(response.context['page_obj'][0], new_post)
@@ -125,7 +113,7 @@ class PostViewsTests(TestCase):
         post_group_0 = first_object.group
         post_image_0 = first_object.image
         self.assertEqual(post_text_0, PostViewsTests.post.text)
-        self.assertEqual(post_author_0, PostViewsTests.user)
+        self.assertEqual(post_author_0, self.author)
         self.assertEqual(post_group_0, PostViewsTests.group)
         self.assertEqual(post_image_0, PostViewsTests.post.image)
 
@@ -140,10 +128,10 @@ class PostViewsTests(TestCase):
     def test_profile_show_correct_context(self):
         """Шаблон profile сформирован с правильным контекстом."""
         response = self.authorized_client_author.get(
-            reverse('posts:profile', args=(PostViewsTests.user.username,))
+            reverse('posts:profile', args=(self.author.username,))
         )
         self.assertIsInstance(response.context['page_obj'][0], Post)
-        self.assertEqual(response.context['profile'], PostViewsTests.user)
+        self.assertEqual(response.context['profile'], self.author)
 
     def test_post_detail_show_correct_context(self):
         """Шаблон post_detail сформирован с правильным контекстом."""
@@ -211,6 +199,17 @@ class PostViewsTests(TestCase):
         )
         self.assertRedirects(response, f'/posts/{PostViewsTests.post.pk}/')
 
+    def test_post_image_srcset(self):
+        """Картинка поста выводится с вариантами для srcset."""
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, '<picture>')
+        for width in settings.POST_THUMBNAIL_WIDTHS:
+            with self.subTest(width=width):
+                self.assertContains(response, f' {width}w')
+        self.assertContains(
+            response, f'sizes="{settings.POST_THUMBNAIL_SIZES}"'
+        )
+
     def test_caches_on_index_page(self):
         """"Проверка кэша на странице index"""
         new_post = Post.objects.create(
@@ -227,26 +226,24 @@ class PostViewsTests(TestCase):
 
 class FollowViewsTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        cls.user = User.objects.create_user(username='auth')
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
+        cls.user = User.objects.create_user(username='HasNoName')
         cls.group = Group.objects.create(
             title='Тестовая группа',
             slug='Test-slug',
             description='Тестовое описание',
         )
         cls.post = Post.objects.create(
-            author=cls.user,
+            author=cls.author,
             text='Тестовый текст',
             group=cls.group,
         )
 
     def setUp(self):
         self.guest_client = Client()
-        self.user = User.objects.create_user(username='HasNoName')
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
-        self.author = FollowViewsTests.user
         self.authorized_client_author = Client()
         self.authorized_client_author.force_login(self.author)
         cache.clear()
@@ -255,7 +252,7 @@ class FollowViewsTests(TestCase):
         """Авторизованный пользователь может подписываться на
         других пользователей"""
         follow_count = Follow.objects.count()
-        author = FollowViewsTests.user
+        author = self.author
         self.authorized_client.get(
             reverse('posts:profile_follow', args=(author,))
         )
@@ -269,7 +266,7 @@ class FollowViewsTests(TestCase):
     def test_auth_user_can_unfollow_authors(self):
         """Авторизованный пользователь может удалять других
         пользователей из подписок"""
-        author = FollowViewsTests.user
+        author = self.author
         self.authorized_client.get(
             reverse('posts:profile_follow', args=(author,))
         )
@@ -288,12 +285,12 @@ class FollowViewsTests(TestCase):
         """Новая запись пользователя появляется в ленте тех,
         кто на него подписан"""
         post = Post.objects.create(
-            author=FollowViewsTests.user,
+            author=self.author,
             text='new post  for test follow',
         )
         Follow.objects.create(
             user=self.user,
-            author=FollowViewsTests.user
+            author=self.author
         )
         response = self.authorized_client.get(reverse('posts:follow_index'))
         post_context = response.context.get('page_obj')
@@ -303,7 +300,7 @@ class FollowViewsTests(TestCase):
         """Новая запись пользователя не появляется в ленте тех,
         кто не подписан."""
         post = Post.objects.create(
-            author=FollowViewsTests.user,
+            author=self.author,
             text='new post  for test follow',
         )
         self.new_user = User.objects.create_user(username='NewHasNoName')
@@ -321,7 +318,7 @@ class FollowViewsTests(TestCase):
 
     def test_profile_follow_view(self):
         """При подписке происходит redirect на профайл автора"""
-        author = FollowViewsTests.user
+        author = self.author
         response = self.authorized_client.get(
             reverse('posts:profile_follow', args=(author,))
         )
@@ -331,7 +328,7 @@ class FollowViewsTests(TestCase):
 
     def test_profile_unfollow_view(self):
         """При отписке происходит redirect на профайл автора"""
-        author = FollowViewsTests.user
+        author = self.author
         Follow.objects.create(
             user=self.user,
             author=author
@@ -346,9 +343,8 @@ class FollowViewsTests(TestCase):
 
 class PaginatorViewsTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        cls.user = User.objects.create_user(username='auth')
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
         cls.group = Group.objects.create(
             title='Тестовая группа',
             slug='Test-slug',
@@ -357,14 +353,13 @@ class PaginatorViewsTests(TestCase):
         posts = [
             Post(
                 text=f'Text post #{i}',
-                author=cls.user,
+                author=cls.author,
                 group=cls.group,
             ) for i in range(0, 27)
         ]
         Post.objects.bulk_create(posts)
 
     def setUp(self):
-        self.author = PaginatorViewsTests.user
         self.authorized_client_author = Client()
         self.authorized_client_author.force_login(self.author)
 
@@ -375,7 +370,7 @@ class PaginatorViewsTests(TestCase):
         posts_count_on_last_page = post_count % settings.POST_IN_PAGE
         index_url = ('posts:index', None)
         profile_url = (
-            'posts:profile', (PaginatorViewsTests.user.username,)
+            'posts:profile', (self.author.username,)
         )
         group_url = (
             'posts:group_list', (PaginatorViewsTests.group.slug,)
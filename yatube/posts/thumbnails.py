@@ -0,0 +1,19 @@
+from sorl.thumbnail import base
+
+from core.metrics import Histogram
+
+THUMBNAIL_SECONDS = Histogram(
+    'yatube_thumbnail_seconds', 'Время построения миниатюры',
+    ('format',),
+)
+
+
+class ThumbnailBackend(base.ThumbnailBackend):
+    """Замеряет построение миниатюр; попадания в kvstore не считаются."""
+
+    def _create_thumbnail(self, source_image, geometry_string, options,
+                          thumbnail):
+        with THUMBNAIL_SECONDS.time(format=options['format']):
+            super()._create_thumbnail(
+                source_image, geometry_string, options, thumbnail
+            )
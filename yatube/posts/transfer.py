@@ -0,0 +1,266 @@
+"""Потоковый экспорт и импорт постов, групп, комментариев и подписок.
+
+Записи идут в порядке group, post, comment, archived_post,
+archived_comment, follow, поэтому при импорте все ссылки уже известны.
+Пользователи передаются по username, группы сопоставляются по slug, а
+идентификаторы постов и архивных постов сдвигаются на максимальный id
+среди постов и архива: таблица соответствий в памяти не нужна.
+"""
+import csv
+import json
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import F, Max
+from django.utils.dateparse import parse_datetime
+
+from core.page_cache import invalidate_pages
+
+from .models import (ArchivedComment, ArchivedPost, Comment, Follow, Group,
+                     Post, User)
+from .snapshots import reset_group_snapshots
+
+FIELDS = {
+    'group': ('id', 'title', 'slug', 'description'),
+    'post': ('id', 'text', 'pub_date', 'author', 'group', 'image',
+             'image_width', 'image_height'),
+    'comment': ('id', 'post', 'author', 'text', 'created'),
+    'archived_post': ('id', 'text', 'pub_date', 'author', 'group', 'image',
+                      'image_width', 'image_height', 'archived'),
+    'archived_comment': ('id', 'post', 'author', 'text', 'created'),
+    'follow': ('user', 'author'),
+}
+COLUMNS = ('model',) + tuple(dict.fromkeys(
+    field for fields in FIELDS.values() for field in fields
+))
+INTEGER_FIELDS = ('id', 'group', 'post', 'image_width', 'image_height')
+DATE_FIELDS = ('pub_date', 'created', 'archived')
+QUERIES = {
+    'group': lambda: Group.objects.values(
+        'id', 'title', 'slug', 'description'
+    ),
+    'post': lambda: Post.objects.values(
+        'id', 'text', 'pub_date', 'group', 'image', 'image_width',
+        'image_height', author_name=F('author__username'),
+    ),
+    'comment': lambda: Comment.objects.values(
+        'id', 'post', 'text', 'created',
+        author_name=F('author__username'),
+    ),
+    'archived_post': lambda: ArchivedPost.objects.values(
+        'id', 'text', 'pub_date', 'group', 'image', 'image_width',
+        'image_height', 'archived', author_name=F('author__username'),
+    ),
+    'archived_comment': lambda: ArchivedComment.objects.values(
+        'id', 'post', 'text', 'created',
+        author_name=F('author__username'),
+    ),
+    'follow': lambda: Follow.objects.values(
+        user_name=F('user__username'),
+        author_name=F('author__username'),
+    ),
+}
+
+
+def export_records(chunk_size=2000):
+    """Выдаёт записи всех моделей по одной, не загружая таблицы целиком."""
+    for model, query in QUERIES.items():
+        rows = query().order_by('pk').iterator(chunk_size=chunk_size)
+        for row in rows:
+            if 'author_name' in row:
+                row['author'] = row.pop('author_name')
+            if 'user_name' in row:
+                row['user'] = row.pop('user_name')
+            for field in DATE_FIELDS:
+                if field in row:
+                    row[field] = row[field].isoformat()
+            yield dict(model=model, **row)
+
+
+def write_ndjson(records, stream):
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        yield record
+
+
+def write_csv(records, stream):
+    writer = csv.DictWriter(stream, COLUMNS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        yield record
+
+
+def read_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        record = {'model': row['model']}
+        for field in FIELDS[row['model']]:
+            value = row[field]
+            if field in INTEGER_FIELDS:
+                value = int(value) if value else None
+            record[field] = value
+        yield record
+
+
+@contextmanager
+def original_dates():
+    """Не даёт auto_now_add затереть даты из файла при bulk_create."""
+    fields = (
+        Post._meta.get_field('pub_date'),
+        Comment._meta.get_field('created'),
+        ArchivedPost._meta.get_field('archived'),
+    )
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        # Архивный пост сохраняет id, занимать его нельзя
+        self.post_offset = max(
+            model.objects.aggregate(last=Max('pk'))['last'] or 0
+            for model in (Post, ArchivedPost)
+        )
+        self.groups = {}
+
+    def user_ids(self, usernames):
+        """Находит пользователей пачки, недостающих создаёт без пароля."""
+        usernames = set(usernames)
+        ids = dict(User.objects.filter(
+            username__in=usernames
+        ).values_list('username', 'pk'))
+        missing = [
+            User(username=username, password='!', is_active=False)
+            for username in usernames - ids.keys()
+        ]
+        if missing:
+            User.objects.bulk_create(missing)
+            ids.update(User.objects.filter(
+                username__in=usernames - ids.keys()
+            ).values_list('username', 'pk'))
+        return ids
+
+    def import_group(self, records):
+        slugs = {record['slug']: record for record in records}
+        existing = dict(Group.objects.filter(
+            slug__in=slugs
+        ).values_list('slug', 'pk'))
+        Group.objects.bulk_create(
+            Group(title=record['title'],
+                  slug=record['slug'],
+                  description=record['description'])
+            for slug, record in slugs.items() if slug not in existing
+        )
+        ids = dict(Group.objects.filter(
+            slug__in=slugs
+        ).values_list('slug', 'pk'))
+        for record in records:
+            self.groups[record['id']] = ids[record['slug']]
+
+    def import_post(self, records):
+        authors = self.user_ids(record['author'] for record in records)
+        Post.objects.bulk_create(
+            Post(pk=record['id'] + self.post_offset,
+                 text=record['text'],
+                 pub_date=parse_datetime(record['pub_date']),
+                 author_id=authors[record['author']],
+                 group_id=self.groups.get(record['group']),
+                 image=record['image'] or '',
+                 image_width=record['image_width'],
+                 image_height=record['image_height'])
+            for record in records
+        )
+
+    def import_comment(self, records):
+        authors = self.user_ids(record['author'] for record in records)
+        Comment.objects.bulk_create(
+            Comment(post_id=record['post'] + self.post_offset,
+                    author_id=authors[record['author']],
+                    text=record['text'],
+                    created=parse_datetime(record['created']))
+            for record in records
+        )
+
+    def import_archived_post(self, records):
+        authors = self.user_ids(record['author'] for record in records)
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(pk=record['id'] + self.post_offset,
+                         text=record['text'],
+                         pub_date=parse_datetime(record['pub_date']),
+                         author_id=authors[record['author']],
+                         group_id=self.groups.get(record['group']),
+                         image=record['image'] or '',
+                         image_width=record['image_width'],
+                         image_height=record['image_height'],
+                         archived=parse_datetime(record['archived']))
+            for record in records
+        )
+
+    def import_archived_comment(self, records):
+        authors = self.user_ids(record['author'] for record in records)
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(post_id=record['post'] + self.post_offset,
+                            author_id=authors[record['author']],
+                            text=record['text'],
+                            created=parse_datetime(record['created']))
+            for record in records
+        )
+
+    def import_follow(self, records):
+        users = self.user_ids(
+            name for record in records
+            for name in (record['user'], record['author'])
+        )
+        Follow.objects.bulk_create(
+            (Follow(user_id=users[record['user']],
+                    author_id=users[record['author']])
+             for record in records),
+            ignore_conflicts=True,
+        )
+
+    def run(self, records):
+        """Импортирует записи пачками; возвращает генератор (модель, число)."""
+        batch = []
+        for record in records:
+            if batch and (
+                record['model'] != batch[0]['model']
+                or len(batch) >= self.batch_size
+            ):
+                yield self.flush(batch)
+                batch = []
+            batch.append(record)
+        if batch:
+            yield self.flush(batch)
+
+    def flush(self, batch):
+        model = batch[0]['model']
+        with transaction.atomic():
+            getattr(self, f'import_{model}')(batch)
+        return model, len(batch)
+
+
+def import_records(records, batch_size):
+    """Импортирует записи, по мере работы выдавая (модель, число)."""
+    importer = Importer(batch_size)
+    with original_dates():
+        yield from importer.run(records)
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+            no_style(), [Post, Comment, ArchivedComment, Group]
+        ):
+            cursor.execute(sql)
+    reset_group_snapshots()
+    invalidate_pages()
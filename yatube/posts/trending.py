@@ -0,0 +1,84 @@
+"""Популярные посты.
+
+Счёт поста хранится в индексированной колонке trending_score и
+растёт на месте при каждом новом комментарии и подписке на автора.
+Команда decay_trending периодически умножает все ненулевые счета на
+множитель затухания, так что давняя активность весит меньше свежей,
+а страница популярного остаётся одним чтением по индексу.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .hydration import hydrate_posts
+from .models import Post
+
+FOLLOW_KEY = 'trending:follow:{user}:{author}'
+
+
+def add_score(queryset, weight):
+    return queryset.update(trending_score=F('trending_score') + weight)
+
+
+def record_comment(comment):
+    add_score(
+        Post.objects.filter(pk=comment.post_id),
+        settings.TRENDING_COMMENT_WEIGHT,
+    )
+
+
+def record_follow(follow):
+    """Подписка поднимает недавние посты автора.
+
+    Пара подписчик — автор засчитывается раз в TRENDING_FOLLOW_DAYS,
+    иначе повторные подписки и отписки накручивали бы счёт без предела.
+    """
+    days = settings.TRENDING_FOLLOW_DAYS
+    key = FOLLOW_KEY.format(user=follow.user_id, author=follow.author_id)
+    if not cache.add(key, True, timedelta(days=days).total_seconds()):
+        return
+    since = timezone.now() - timedelta(days=days)
+    add_score(
+        Post.objects.filter(author_id=follow.author_id, pub_date__gte=since),
+        settings.TRENDING_FOLLOW_WEIGHT,
+    )
+
+
+def decay_scores(hours):
+    """Затухание за hours часов с периодом полураспада из настроек.
+
+    Счета ниже TRENDING_MIN_SCORE обнуляются, чтобы выборка
+    ненулевых постов оставалась маленькой. Возвращает число постов,
+    оставшихся в популярном.
+    """
+    factor = 0.5 ** (hours / settings.TRENDING_HALF_LIFE_HOURS)
+    scored = Post.objects.filter(trending_score__gt=0)
+    scored.update(trending_score=F('trending_score') * factor)
+    scored.filter(
+        trending_score__lt=settings.TRENDING_MIN_SCORE
+    ).update(trending_score=0)
+    return scored.count()
+
+
+def trending_ids():
+    return list(
+        Post.objects.filter(trending_score__gt=0).order_by(
+            '-trending_score', '-pk'
+        ).values_list('pk', flat=True)[:settings.TRENDING_SIZE]
+    )
+
+
+class TrendingPostList:
+    """Популярные посты для Paginator: id одним запросом по индексу."""
+
+    def __init__(self):
+        self.ids = trending_ids()
+
+    def count(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return hydrate_posts(self.ids[index])
@@ -1,11 +1,12 @@
 from django.urls import path
 
-from . import views
+from . import feeds, live, sitemaps, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('trending/', views.trending, name='trending'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
@@ -17,6 +18,59 @@ urlpatterns = [
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('live/', live.stream, name='live_stream'),
+    path('live/poll/', live.poll, name='live_poll'),
+    path('live/posts/', live.new_posts, name='live_posts'),
+    path(
+        'notifications/',
+        views.notifications,
+        name='notifications'
+    ),
+    path(
+        'notifications/read/',
+        views.notifications_read,
+        name='notifications_read'
+    ),
+    path(
+        'feed/',
+        feeds.cached_feed(feeds.feed_posts)(feeds.LatestPostsFeed()),
+        name='feed'
+    ),
+    path(
+        'feed/atom/',
+        feeds.cached_feed(feeds.feed_posts)(
+            feeds.LatestPostsAtomFeed()
+        ),
+        name='feed_atom'
+    ),
+    path(
+        'group/<slug:slug>/feed/',
+        feeds.cached_feed(feeds.group_feed_posts)(
+            feeds.GroupPostsFeed()
+        ),
+        name='group_feed'
+    ),
+    path(
+        'group/<slug:slug>/feed/atom/',
+        feeds.cached_feed(feeds.group_feed_posts)(
+            feeds.GroupPostsAtomFeed()
+        ),
+        name='group_feed_atom'
+    ),
+    path(
+        'profile/<str:username>/feed/',
+        feeds.cached_feed(feeds.author_feed_posts)(
+            feeds.AuthorPostsFeed()
+        ),
+        name='profile_feed'
+    ),
+    path(
+        'profile/<str:username>/feed/atom/',
+        feeds.cached_feed(feeds.author_feed_posts)(
+            feeds.AuthorPostsAtomFeed()
+        ),
+        name='profile_feed_atom'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -27,4 +81,15 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path(
+        'stats/post-cards/',
+        views.post_card_stats,
+        name='post_card_stats'
+    ),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap'),
+    path(
+        'sitemap-<str:section>-<int:shard>.xml',
+        sitemaps.sitemap_section,
+        name='sitemap_section'
+    ),
 ]
@@ -1,10 +1,23 @@
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
 
+from core.page_cache import cached_page
+from core.paginator import QuerySetChain
+from core.ratelimit import ratelimit
+from core.uploadhandlers import add_upload_errors
+
+from .cards import card_stats
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .hydration import HydratedPosts
+from .notifications import inbox, mark_read
+from .models import ArchivedPost, Follow, Group, Post, User
+from .snapshots import GroupPostList
+from .trending import TrendingPostList
 
 
 def paginator_method(request, posts):
@@ -14,8 +27,9 @@ def paginator_method(request, posts):
     return page_obj
 
 
+@cached_page
 def index(request):
-    post_list = Post.objects.all()
+    post_list = HydratedPosts(Post.objects.all())
     page_obj = paginator_method(request, post_list)
     context = {
         'page_obj': page_obj,
@@ -23,12 +37,23 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@cached_page
+def trending(request):
+    page_obj = paginator_method(request, TrendingPostList())
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/trending.html', context)
+
+
 @login_required
+@ratelimit('post_create', methods=('POST',))
 def post_create(request):
     form = PostForm(
         request.POST or None,
         files=request.FILES or None
     )
+    add_upload_errors(request, form)
     if form.is_valid():
         new_post = form.save(commit=False)
         new_post.author = request.user
@@ -50,6 +75,7 @@ def post_edit(request, post_id):
         instance=post,
         files=request.FILES or None
     )
+    add_upload_errors(request, form)
     if form.is_valid():
         form.save()
         return redirect('posts:post_detail', post_id)
@@ -61,6 +87,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@ratelimit('add_comment', methods=('POST',))
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -72,11 +99,11 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@cached_page
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = paginator_method(request, posts)
+    page_obj = paginator_method(request, GroupPostList(group))
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -84,27 +111,33 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@cached_page
 def profile(request, username):
     profile = get_object_or_404(User, username=username)
-    post_list = profile.posts.all()
-    following = request.user.is_authenticated and profile.following.filter(
-        user=request.user
-    ).exists()
+    # Архивные посты старше горячих, поэтому идут следом за ними
+    post_list = QuerySetChain(
+        HydratedPosts(profile.posts.all()),
+        profile.archived_posts.select_related('author', 'group'),
+    )
     page_obj = paginator_method(request, post_list)
     context = {
         'profile': profile,
         'page_obj': page_obj,
-        'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@cached_page
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.all()
+    post = Post.objects.filter(pk=post_id).first()
+    archived = post is None
+    if archived:
+        post = get_object_or_404(ArchivedPost, pk=post_id)
+    comments = post.comments.select_related('author')
     form = CommentForm(request.POST or None)
     context = {
         'post': post,
+        'archived': archived,
         'comments': comments,
         'form': form,
     }
@@ -114,9 +147,7 @@ def post_detail(request, post_id):
 @login_required
 def follow_index(request):
     follow = request.user.follower.all().values('author')
-    posts = Post.objects.filter(
-        author__in=follow).select_related('author')
-    post_list = [post for post in posts]
+    post_list = HydratedPosts(Post.objects.filter(author__in=follow))
     page_obj = paginator_method(request, post_list)
     context = {
         'page_obj': page_obj,
@@ -125,6 +156,7 @@ def follow_index(request):
 
 
 @login_required
+@ratelimit('profile_follow')
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author == request.user:
@@ -142,3 +174,28 @@ def profile_unfollow(request, username):
         author=author
     ).delete()
     return redirect('posts:profile', username)
+
+
+@login_required
+def notifications(request):
+    context = {
+        'notifications': inbox(request.user),
+    }
+    return render(request, 'posts/notifications.html', context)
+
+
+@login_required
+@require_POST
+def notifications_read(request):
+    if 'all' in request.POST:
+        mark_read(request.user)
+    else:
+        ids = [pk for pk in request.POST.getlist('ids') if pk.isdigit()]
+        if ids:
+            mark_read(request.user, ids)
+    return redirect('posts:notifications')
+
+
+@staff_member_required
+def post_card_stats(request):
+    return JsonResponse(card_stats())
@@ -0,0 +1,109 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from taskqueue.queue import claim_next, complete, execute, fail, release
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.TASKS_PROCESSES,
+            help='Размер пула процессов; 0 выполняет задачи в этом процессе',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда в очереди не останется готовых задач',
+        )
+
+    def handle(self, *args, processes, once, **options):
+        if processes == 0:
+            self.run_inline(once)
+            return
+        # Дочерние процессы запускаются заново и сами открывают соединения
+        connections.close_all()
+        while True:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            ) as pool:
+                try:
+                    self.run_pool(pool, processes, once)
+                    return
+                except BrokenProcessPool:
+                    # Дочерний процесс умер, и пул больше не принимает задачи
+                    self.stderr.write('Пул процессов сломан, создаём новый')
+
+    def run_inline(self, once):
+        while True:
+            task = claim_next()
+            if task is None:
+                if once:
+                    return
+                time.sleep(settings.TASKS_POLL_INTERVAL)
+                continue
+            try:
+                execute(task.name, task.arguments)
+            except Exception as error:
+                self.report(task, error)
+                fail(task, error)
+            else:
+                self.report(task)
+                complete(task)
+
+    def run_pool(self, pool, processes, once):
+        running = {}
+        while True:
+            self.submit(pool, running, processes)
+            if not running:
+                if once:
+                    return
+                time.sleep(settings.TASKS_POLL_INTERVAL)
+                continue
+            done, _ = wait(
+                running,
+                timeout=settings.TASKS_POLL_INTERVAL,
+                return_when=FIRST_COMPLETED,
+            )
+            self.finish(done, running)
+
+    def submit(self, pool, running, processes):
+        while len(running) < processes:
+            task = claim_next()
+            if task is None:
+                return
+            try:
+                future = pool.submit(execute, task.name, task.arguments)
+            except BrokenProcessPool:
+                release(task)
+                raise
+            running[future] = task
+
+    def finish(self, done, running):
+        broken = False
+        for future in done:
+            task = running.pop(future)
+            error = future.exception()
+            self.report(task, error)
+            if error is None:
+                complete(task)
+            else:
+                fail(task, error)
+            broken = broken or isinstance(error, BrokenProcessPool)
+        if broken:
+            raise BrokenProcessPool('Дочерний процесс завершился')
+
+    def report(self, task, error=None):
+        if error is None:
+            self.stdout.write(f'{task.name} #{task.pk}: выполнена')
+        else:
+            self.stderr.write(f'{task.name} #{task.pk}: {error!r}')
@@ -0,0 +1,146 @@
+"""Очередь фоновых задач на таблице в основной базе.
+
+Функция, обёрнутая в @task, ставится в очередь через .delay() и
+выполняется командой run_worker. Задача ищется по полному пути к
+функции, поэтому дочерним процессам воркера реестр не нужен.
+"""
+import json
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, F, IntegerField, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+
+class TaskFunction:
+    def __init__(self, func, priority, max_attempts, concurrency):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        if settings.TASKS_ALWAYS_EAGER:
+            self.func(*args, **kwargs)
+            return None
+        return Task.objects.create(
+            name=self.name,
+            arguments=json.dumps([args, kwargs]),
+            priority=self.priority,
+            max_attempts=self.max_attempts,
+        )
+
+
+def task(priority=0, max_attempts=3, concurrency=None):
+    """Делает функцию фоновой задачей.
+
+    concurrency ограничивает число одновременно выполняемых
+    экземпляров задачи во всех воркерах.
+    """
+    def decorator(func):
+        return TaskFunction(func, priority, max_attempts, concurrency)
+    return decorator
+
+
+def execute(name, arguments):
+    """Выполняет задачу; вызывается в процессе пула."""
+    close_old_connections()
+    try:
+        args, kwargs = json.loads(arguments)
+        import_string(name)(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def claim_next():
+    """Забирает самую приоритетную готовую задачу или возвращает None.
+
+    Задачи, зависшие в статусе «выполняется» дольше TASKS_LOCK_TIMEOUT,
+    считаются брошенными упавшим воркером; если попытки исчерпаны,
+    задача помечается ошибкой, а не запускается снова.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    candidates = Task.objects.filter(
+        Q(status=Task.QUEUED, run_at__lte=now)
+        | Q(status=Task.RUNNING, started_at__lt=stale)
+    )
+    for candidate in candidates[:settings.TASKS_CLAIM_BATCH]:
+        try:
+            concurrency = import_string(candidate.name).concurrency
+        except ImportError as error:
+            candidate.attempts = candidate.max_attempts
+            fail(candidate, error)
+            continue
+        if (candidate.status == Task.RUNNING
+                and candidate.attempts >= candidate.max_attempts):
+            fail(candidate, TimeoutError(
+                'Задача не завершилась за TASKS_LOCK_TIMEOUT'
+            ))
+            continue
+        claimable = Task.objects.filter(
+            pk=candidate.pk,
+            status=candidate.status,
+            attempts=candidate.attempts,
+        )
+        if concurrency is not None:
+            # Лимит проверяется в том же UPDATE, что и захват задачи,
+            # иначе два воркера могут одновременно пройти проверку
+            running = Task.objects.filter(
+                name=candidate.name,
+                status=Task.RUNNING,
+                started_at__gte=stale,
+            ).order_by().values('name').annotate(
+                count=Count('pk')
+            ).values('count')
+            claimable = claimable.annotate(
+                running=Coalesce(
+                    Subquery(running, output_field=IntegerField()), 0
+                )
+            ).filter(running__lt=concurrency)
+        claimed = claimable.update(
+            status=Task.RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            candidate.refresh_from_db()
+            return candidate
+    return None
+
+
+def complete(task):
+    task.delete()
+
+
+def release(task):
+    """Возвращает взятую задачу в очередь, не засчитывая попытку."""
+    Task.objects.filter(pk=task.pk, status=Task.RUNNING).update(
+        status=Task.QUEUED,
+        attempts=F('attempts') - 1,
+    )
+
+
+def fail(task, error):
+    """Откладывает задачу с экспоненциальной задержкой или помечает ошибкой."""
+    task.last_error = ''.join(traceback.format_exception(
+        type(error), error, error.__traceback__
+    ))
+    if task.attempts >= task.max_attempts:
+        task.status = Task.FAILED
+    else:
+        task.status = Task.QUEUED
+        task.run_at = timezone.now() + timedelta(
+            seconds=settings.TASKS_RETRY_DELAY * 2 ** (task.attempts - 1)
+        )
+    task.save()
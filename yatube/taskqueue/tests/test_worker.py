@@ -0,0 +1,126 @@
+import os
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Task
+from ..queue import claim_next, task
+
+calls = []
+
+
+@task()
+def record(value):
+    calls.append(value)
+
+
+@task(priority=10)
+def record_urgent(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def broken():
+    raise ValueError('сломалось')
+
+
+@task(concurrency=1)
+def limited():
+    pass
+
+
+@task(priority=10)
+def crash():
+    os._exit(1)
+
+
+class WorkerTests(TestCase):
+    # Пул процессов нельзя создать внутри процесса параллельного прогона
+    serial = True
+
+    def setUp(self):
+        calls.clear()
+
+    def run_worker(self, processes=0):
+        call_command(
+            'run_worker', processes=processes, once=True,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+
+    def test_tasks_run_by_priority(self):
+        """Задачи выполняются по приоритету и удаляются из очереди."""
+        record.delay('обычная')
+        record_urgent.delay('срочная')
+        self.run_worker()
+        self.assertEqual(calls, ['срочная', 'обычная'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_retried_then_marked_failed(self):
+        """Упавшая задача откладывается, а после всех попыток
+        помечается ошибкой."""
+        broken.delay()
+        self.run_worker()
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, Task.QUEUED)
+        self.assertEqual(failed.attempts, 1)
+        self.assertGreater(failed.run_at, timezone.now())
+        Task.objects.update(run_at=timezone.now())
+        self.run_worker()
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, Task.FAILED)
+        self.assertEqual(failed.attempts, 2)
+        self.assertIn('ValueError', failed.last_error)
+
+    def test_concurrency_limit(self):
+        """Задача не забирается, пока исчерпан её лимит параллельности."""
+        Task.objects.create(
+            name=limited.name,
+            status=Task.RUNNING,
+            started_at=timezone.now(),
+        )
+        limited.delay()
+        self.assertIsNone(claim_next())
+
+    def test_process_pool(self):
+        """Задачи выполняются в пуле процессов."""
+        limited.delay()
+        broken.delay()
+        self.run_worker(processes=1)
+        failed = Task.objects.get()
+        self.assertEqual(failed.name, broken.name)
+        self.assertIn('сломалось', failed.last_error)
+
+    def test_broken_pool_rebuilt(self):
+        """После гибели дочернего процесса пул создаётся заново."""
+        crash.delay()
+        limited.delay()
+        self.run_worker(processes=1)
+        crashed = Task.objects.get()
+        self.assertEqual(crashed.name, crash.name)
+        self.assertEqual(crashed.status, Task.QUEUED)
+        self.assertEqual(crashed.attempts, 1)
+        self.assertIn('BrokenProcessPool', crashed.last_error)
+
+    def test_stale_task_out_of_attempts_failed(self):
+        """Брошенная задача без попыток помечается ошибкой."""
+        stale = Task.objects.create(
+            name=crash.name,
+            status=Task.RUNNING,
+            started_at=timezone.now() - timedelta(days=1),
+            attempts=3,
+            max_attempts=3,
+        )
+        self.assertIsNone(claim_next())
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Task.FAILED)
+        self.assertIn('TASKS_LOCK_TIMEOUT', stale.last_error)
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_eager_mode(self):
+        """В режиме TASKS_ALWAYS_EAGER задача выполняется сразу."""
+        record.delay('сразу')
+        self.assertEqual(calls, ['сразу'])
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+
+from taskqueue.queue import task
+
+User = get_user_model()
+
+
+@task(priority=5)
+def send_welcome_email(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return
+    send_mail(
+        'Добро пожаловать в Yatube',
+        f'Здравствуйте, {user.username}! Вы зарегистрировались в Yatube.',
+        None,
+        [user.email],
+    )
@@ -1,10 +1,22 @@
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView
 
+from core.ratelimit import ratelimit
+
 from .forms import CreationForm
+from .tasks import send_welcome_email
 
 
+@method_decorator(
+    ratelimit('signup', methods=('POST',)), name='dispatch'
+)
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        send_welcome_email.delay(self.object.pk)
+        return response
@@ -16,7 +16,7 @@ ALLOWED_HOSTS = [
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.LocMemCache',
     }
 }
 
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'taskqueue.apps.TaskqueueConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -35,11 +36,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.slowqueries.SlowQueryMiddleware',
+    'core.uploadhandlers.UploadSizeMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -112,6 +117,78 @@ LOGIN_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 POST_IN_PAGE = 10
+PAGE_CACHE_TIMEOUT = 60 * 5
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_MAX_AGE = 60 * 5
+# Списки в админке берут оценку числа строк из статистики СУБД; на SQLite
+# она появляется после manage.py analyze_tables, до того считается COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = 100000
+MODERATION_CHUNK_SIZE = 500
+MODERATION_BACKGROUND_THRESHOLD = 5000
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 500
+GROUP_SNAPSHOT_SIZE = 200
+GROUP_SNAPSHOT_TIMEOUT = 60 * 60
+HYDRATION_CACHE_TIMEOUT = 60 * 60
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+TRENDING_COMMENT_WEIGHT = 1
+TRENDING_FOLLOW_WEIGHT = 2
+TRENDING_FOLLOW_DAYS = 7
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_MIN_SCORE = 0.01
+TRENDING_SIZE = 100
+NOTIFICATIONS_INBOX_SIZE = 50
+NOTIFICATIONS_CACHE_TIMEOUT = 60 * 60
+LIVE_BUFFER_SIZE = 50
+LIVE_REPLAY_SIZE = 200
+# Меньше числа потоков воркера, чтобы открытые ленты не заняли все
+LIVE_MAX_CONNECTIONS = 4
+LIVE_STREAM_SECONDS = 30
+LIVE_HEARTBEAT_SECONDS = 10
+LIVE_POLL_TIMEOUT = 10
+LIVE_RETRY_MS = 3000
+LIVE_BUSY_RETRY_MS = 30000
+PROFILING_ENABLED = True
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILING_MAX_ENTRIES = 100
+PROFILING_STATS_LIMIT = 60
+SLOW_QUERY_ENABLED = True
+SLOW_QUERY_THRESHOLD = 100
+METRICS_ENABLED = True
+# Prometheus передаёт его в заголовке Authorization: Bearer <токен>
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR')
+METRICS_FLUSH_INTERVAL = 5
+SITEMAP_SHARD_SIZE = 50000
+SITEMAP_CACHE_TIMEOUT = 60 * 60
+TEST_RUNNER = 'core.runner.ParallelTestRunner'
+TASKS_ALWAYS_EAGER = False
+TASKS_PROCESSES = 2
+TASKS_POLL_INTERVAL = 1
+TASKS_CLAIM_BATCH = 20
+TASKS_RETRY_DELAY = 10
+TASKS_LOCK_TIMEOUT = 60 * 10
+RATELIMIT_ENABLED = True
+RATELIMIT_STORE = 'core.ratelimit.LocalStore'
+RATELIMIT_CACHE = 'default'
+RATELIMITS = {
+    'post_create': '10/m',
+    'add_comment': '20/m',
+    'profile_follow': '30/m',
+    'signup': '5/h',
+}
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+FILE_UPLOAD_HANDLERS = ['core.uploadhandlers.StreamingUploadHandler']
+UPLOAD_MAX_FILE_SIZE = 10 * 1024 * 1024
+UPLOAD_MAX_REQUEST_SIZE = 12 * 1024 * 1024
+UPLOAD_MAX_IMAGE_PIXELS = 50 * 1000 * 1000
+POST_IMAGE_MAX_SIZE = (1920, 1920)
+POST_IMAGE_FORMAT = 'WEBP'
+POST_IMAGE_QUALITY = 80
+POST_THUMBNAIL_SIZE = (960, 339)
+POST_THUMBNAIL_WIDTHS = (480, 960, 1440)
+POST_THUMBNAIL_SIZES = '(max-width: 960px) 100vw, 960px'
+THUMBNAIL_BACKEND = 'posts.thumbnails.ThumbnailBackend'
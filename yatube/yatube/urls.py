@@ -3,12 +3,16 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import metrics_export, ratelimit_stats
+
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('stats/ratelimit/', ratelimit_stats, name='ratelimit_stats'),
+    path('metrics', metrics_export, name='metrics'),
 ]
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'